@@ -28,6 +28,13 @@ except ImportError:
         PLAY = '>'
     def make_header(title, width=60): return f"\n{'=' * width}\n  {title}\n{'=' * width}\n"
 
+# Validador en proceso (evita relanzar validate_plan.py y re-parsear el plan)
+try:
+    from validate_plan import validate_plan_dict
+    HAS_VALIDATOR = True
+except ImportError:
+    HAS_VALIDATOR = False
+
 
 def run_command(cmd: str, cwd: str = ".") -> Dict[str, Any]:
     """Ejecuta un comando y captura output."""
@@ -145,10 +152,15 @@ def run_verification_commands(plan: Dict) -> List[Dict[str, Any]]:
     return results
 
 
-def generate_evidence_report(plan_path: str, output_path: Optional[str] = None) -> Dict[str, Any]:
-    """Genera reporte completo de evidencia."""
-    with open(plan_path, 'r', encoding='utf-8') as f:
-        plan = json.load(f)
+def generate_evidence_report(
+    plan_path: str,
+    output_path: Optional[str] = None,
+    plan: Optional[Dict] = None
+) -> Dict[str, Any]:
+    """Genera reporte completo de evidencia (plan: dict ya parseado, opcional)."""
+    if plan is None:
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
     
     print(make_header("AGCCE Evidence Collector v1.0"))
     
@@ -201,11 +213,18 @@ def generate_evidence_report(plan_path: str, output_path: Optional[str] = None)
     
     # Validacion del plan
     print(f"\n{Colors.BOLD}Validando plan...{Colors.RESET}")
-    validate_result = run_command(f"python scripts/validate_plan.py {plan_path}")
-    report["plan_validation"] = {
-        "passed": validate_result["success"],
-        "output": validate_result["stdout"][:1000]
-    }
+    if HAS_VALIDATOR:
+        passed, errors, warnings = validate_plan_dict(plan)
+        report["plan_validation"] = {
+            "passed": passed,
+            "output": "\n".join(errors + warnings)[:1000]
+        }
+    else:
+        validate_result = run_command(f"python scripts/validate_plan.py {plan_path}")
+        report["plan_validation"] = {
+            "passed": validate_result["success"],
+            "output": validate_result["stdout"][:1000]
+        }
     
     # Calcular score
     all_passed = all(r["success"] for r in report["verification_results"]) if report["verification_results"] else True
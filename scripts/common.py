@@ -6,6 +6,16 @@ Módulo común con utilidades compartidas y configuración de encoding para Wind
 
 import sys
 import os
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Configurar encoding para Windows
 if sys.platform == 'win32':
@@ -35,6 +45,13 @@ class Colors:
     BOLD = '\033[1m'
 
 
+# Sin colores si la salida no es una terminal o si NO_COLOR esta definido
+# (https://no-color.org): evita escribir secuencias ANSI en logs de CI
+if os.environ.get("NO_COLOR") or not (sys.stdout and sys.stdout.isatty()):
+    for _name in ("GREEN", "RED", "YELLOW", "BLUE", "CYAN", "MAGENTA", "RESET", "BOLD"):
+        setattr(Colors, _name, "")
+
+
 # Caracteres ASCII-safe para compatibilidad con Windows
 class Symbols:
     """Símbolos compatibles con todas las consolas."""
@@ -54,14 +71,16 @@ class Symbols:
     CORNER_BR = '+'     # En lugar de ╝
 
 
+@lru_cache(maxsize=32)
 def make_header(title: str, width: int = 60) -> str:
-    """Crea un header con bordes ASCII-safe."""
+    """Crea un header con bordes ASCII-safe (cacheado por titulo y ancho)."""
     line = Symbols.LINE_H * width
     return f"\n{Colors.BOLD}{line}\n  {title}\n{line}{Colors.RESET}\n"
 
 
+@lru_cache(maxsize=32)
 def make_box(title: str, width: int = 55) -> str:
-    """Crea un box con bordes ASCII-safe."""
+    """Crea un box con bordes ASCII-safe (cacheado por titulo y ancho)."""
     border_h = Symbols.LINE_H * width
     padding = ' ' * ((width - len(title)) // 2 - 1)
     return f"""
@@ -98,3 +117,39 @@ def safe_print(text: str) -> None:
     except UnicodeEncodeError:
         # Fallback a ASCII
         print(text.encode('ascii', errors='replace').decode('ascii'))
+
+
+# Serializacion JSON compartida: orjson si esta disponible, si no stdlib
+def _loads(data):
+    """Parsea JSON desde str o bytes, usando orjson si esta disponible."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_line(obj) -> bytes:
+    """Serializa a una linea JSONL compacta (UTF-8, terminada en newline)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+
+
+def _dumps_pretty(obj) -> bytes:
+    """Serializa a JSON indentado (UTF-8), usando orjson si esta disponible."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _dumps_canonical(obj) -> bytes:
+    """Serializa a JSON compacto con claves ordenadas (estable para hashes)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _iso_utc(now: Optional[datetime] = None) -> str:
+    """Timestamp UTC ISO-8601 con sufijo Z (sin el utcnow() deprecado)."""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return now.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
@@ -4,6 +4,7 @@ Gem Loader - Carga Gem Bundles en AGCCE v4.0
 Este módulo permite a AGCCE cargar y validar Gem Bundles compilados
 por Gem Builder Compiler, convirtiéndolos en configuraciones de agentes.
 """
+import os
 import json
 import hashlib
 from pathlib import Path
@@ -44,7 +45,7 @@ class GemLoader:
             print("⚠️  Warning: Gem Bundle schema not found. Validation disabled.")
     
     def load_gem(self, gem_path: str) -> Dict:
-       """
+        """
         Carga un Gem Bundle y lo valida contra schema.
         
         Args:
@@ -241,7 +242,8 @@ class GemLoader:
                         gem['bundle_meta']['use_case_id'],
                         gem['bundle_meta']['version'],
                         role,
-                        profile
+                        profile,
+                        profile_path=str(output_path)
                     )
         
         # Registrar Gem en registry
@@ -13,10 +13,15 @@ Uso:
 import json
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 import argparse
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+# Serializacion JSON compartida (orjson si esta disponible)
+from common import _dumps_pretty, _iso_utc
 
 try:
     from gem_loader import GemLoader
@@ -25,6 +30,23 @@ except ImportError:
     sys.exit(1)
 
 
+# Defaults inmutables compartidos por todas las llamadas
+_DEFAULT_AGENT_OVERRIDES = types.MappingProxyType({
+    "system_prompt_source": "gem",
+    "model_source": "gem",
+    "policies_source": "strictest",
+    "mcps_source": "intersection"
+})
+
+_DEFAULT_TASKS = (
+    types.MappingProxyType({"agent": "researcher", "action": "search_context"}),
+    types.MappingProxyType({"agent": "architect", "action": "design_solution"}),
+    types.MappingProxyType({"agent": "constructor", "action": "implement_code"}),
+    types.MappingProxyType({"agent": "auditor", "action": "security_review"}),
+    types.MappingProxyType({"agent": "tester", "action": "create_tests"}),
+)
+
+
 class GemPlanGenerator:
     """Generador de GemPlans (Plan AGCCE + Gem Bundle)"""
     
@@ -57,19 +79,17 @@ class GemPlanGenerator:
         # Cargar metadata del Gem
         gem_info = self.loader.get_gem_info(gem_bundle_path)
         
+        # Un solo timestamp para plan_id y created_at
+        now = datetime.now(timezone.utc)
+        
         # Auto-generar plan_id si no se proporciona
         if plan_id is None:
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             plan_id = f"gemplan_{gem_info['use_case_id']}_{timestamp}"
         
-        # Defaults de agent_overrides
+        # Defaults de agent_overrides (copia: el plan no comparte el constante)
         if agent_overrides is None:
-            agent_overrides = {
-                "system_prompt_source": "gem",
-                "model_source": "gem",
-                "policies_source": "strictest",
-                "mcps_source": "intersection"
-            }
+            agent_overrides = dict(_DEFAULT_AGENT_OVERRIDES)
         
         return {
             # Compatible con AGCCE Plan v1
@@ -92,7 +112,7 @@ class GemPlanGenerator:
             
             # Metadata
             "schema_version": "AGCCE_GemPlan_v1",
-            "created_at": datetime.utcnow().isoformat() + "Z",
+            "created_at": _iso_utc(now),
             "created_by": "gem_plan_generator"
         }
     
@@ -105,32 +125,37 @@ class GemPlanGenerator:
         # Paso 1: Seleccionar Gem
         print("[1/4] Seleccionar Gem Bundle\n")
         
-        gems_dir = Path("gems")
-        if not gems_dir.exists():
+        gems_dir = "gems"
+        if not os.path.isdir(gems_dir):
             print("ERROR: Directorio gems/ no encontrado")
             return None
         
-        gems = list(gems_dir.glob("*.json"))
+        # Una sola pasada de scandir (DirEntry cachea el tipo de archivo)
+        with os.scandir(gems_dir) as it:
+            gems = [e for e in it if e.name.endswith(".json") and e.is_file()]
+        gems.sort(key=lambda e: e.name)
         if not gems:
             print("ERROR: No hay Gem Bundles en gems/")
             print("Copia un Gem Bundle compilado a la carpeta gems/")
             return None
         
         print("Gems disponibles:")
-        for i, gem in enumerate(gems, 1):
-            # Obtener info básica
-            try:
-                info = self.loader.get_gem_info(str(gem))
-                print(f"  [{i}] {info['use_case_id']} v{info['version']}")
-                print(f"      Model: {info['model']}, Risk: {info['risk_score']}")
-            except:
-                print(f"  [{i}] {gem.name} (error al leer)")
+        # Leer metadata en paralelo (I/O) e imprimir en orden según llegan
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(self.loader.get_gem_info, gem.path) for gem in gems]
+            for i, (gem, future) in enumerate(zip(gems, futures, strict=True), 1):
+                try:
+                    info = future.result()
+                    print(f"  [{i}] {info['use_case_id']} v{info['version']}")
+                    print(f"      Model: {info['model']}, Risk: {info['risk_score']}")
+                except Exception:
+                    print(f"  [{i}] {gem.name} (error al leer)")
         
         while True:
             try:
                 choice = int(input("\nSelecciona un Gem [1-{}]: ".format(len(gems))))
                 if 1 <= choice <= len(gems):
-                    selected_gem = str(gems[choice - 1])
+                    selected_gem = gems[choice - 1].path
                     break
             except:
                 pass
@@ -207,8 +232,8 @@ class GemPlanGenerator:
         
         # Guardar
         os.makedirs("plans", exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(gemplan, f, indent=2, ensure_ascii=False)
+        with open(output_path, 'wb') as f:
+            f.write(_dumps_pretty(gemplan))
         
         print(f"\n✓ GemPlan guardado: {output_path}")
         print(f"\nPara ejecutar:")
@@ -265,13 +290,7 @@ Ejemplos:
             tasks = json.load(f)
     else:
         # Tarea básica por defecto
-        tasks = [
-            {"agent": "researcher", "action": "search_context"},
-            {"agent": "architect", "action": "design_solution"},
-            {"agent": "constructor", "action": "implement_code"},
-            {"agent": "auditor", "action": "security_review"},
-            {"agent": "tester", "action": "create_tests"}
-        ]
+        tasks = [dict(task) for task in _DEFAULT_TASKS]
     
     # Generar GemPlan
     gemplan = generator.generate_gemplan(
@@ -284,8 +303,8 @@ Ejemplos:
     output_path = args.output or "plans/gemplan_generated.json"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(gemplan, f, indent=2, ensure_ascii=False)
+    with open(output_path, 'wb') as f:
+        f.write(_dumps_pretty(gemplan))
     
     print(f"✓ GemPlan generado: {output_path}")
 
@@ -7,12 +7,54 @@ Permite:
 - Cache de Agent Profiles generados
 - Tracking de Gems activos
 """
+import atexit
+import functools
 import json
 import os
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import hashlib
+from collections import Counter
+from contextlib import contextmanager
+
+# Serializacion JSON compartida (orjson si esta disponible)
+from common import _dumps_pretty, _dumps_canonical, _iso_utc
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: sin bloqueo entre procesos
+
+
+@functools.lru_cache(maxsize=None)
+def _stat_ok(path: str, mtime_ns: Optional[int]) -> bool:
+    """Verifica (una vez por proceso) que el archivo existe y no cambió"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return mtime_ns is None or st.st_mtime_ns == mtime_ns
+
+
+@functools.lru_cache(maxsize=None)
+def _semver_key(version: str) -> Tuple[int, str]:
+    """
+    Clave de orden SemVer: (major << 40 | minor << 20 | patch, version).
+    
+    Versiones no parseables usan -1 y quedan antes que las válidas.
+    """
+    try:
+        parts = [int(p) for p in version.split('.')]
+    except ValueError:
+        return (-1, version)
+    if not 1 <= len(parts) <= 3 or any(p < 0 or p >= 1 << 20 for p in parts):
+        return (-1, version)
+    major, minor, patch = parts + [0] * (3 - len(parts))
+    return ((major << 40) | (minor << 20) | patch, version)
+
+
+# Usos acumulados en memoria antes de volcarlos al registry
+USAGE_FLUSH_EVERY = 50
 
 
 class GemRegistry:
@@ -20,7 +62,14 @@ class GemRegistry:
     
     def __init__(self, registry_path: str = "config/gem_registry.json"):
         self.registry_path = registry_path
+        # Crear el directorio una sola vez en lugar de en cada escritura
+        os.makedirs(os.path.dirname(registry_path) or '.', exist_ok=True)
+        self.lock_path = registry_path + ".lock"
+        self._pending_usage = Counter()
+        self._last_used = {}
+        self._close_registered = False
         self.registry = self._load_registry()
+        self._profile_index = self._build_profile_index()
     
     def _load_registry(self) -> Dict:
         """Carga registry desde disco o crea uno nuevo"""
@@ -31,14 +80,92 @@ class GemRegistry:
             "version": "1.0.0",
             "gems": {},
             "profiles_cache": {},
-            "created_at": datetime.utcnow().isoformat() + "Z"
+            "created_at": _iso_utc()
         }
     
     def _save_registry(self):
-        """Guarda registry a disco"""
-        os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
-        with open(self.registry_path, 'w', encoding='utf-8') as f:
-            json.dump(self.registry, f, indent=2, ensure_ascii=False)
+        """Guarda registry a disco (escritura atómica: temporal + rename)"""
+        tmp_path = f"{self.registry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_dumps_pretty(self.registry))
+        os.replace(tmp_path, self.registry_path)
+    
+    @contextmanager
+    def _registry_lock(self):
+        """Bloqueo exclusivo entre procesos sobre el registry (solo POSIX)"""
+        if fcntl is None:
+            yield
+            return
+        
+        with open(self.lock_path, 'a') as lock_fp:
+            fcntl.flock(lock_fp, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_fp, fcntl.LOCK_UN)
+    
+    def _build_profile_index(self) -> Dict[Tuple[str, str, str], Tuple[str, Optional[int]]]:
+        """Indexa profiles_cache por (use_case_id, version, role) -> (path, mtime_ns)"""
+        index = {}
+        for entry in self.registry['profiles_cache'].values():
+            use_case_id, role = entry['use_case_id'], entry['role']
+            # Entradas antiguas no guardan el path: usar la ubicación por defecto
+            profile_path = entry.get('profile_path') or f"config/gem_profiles/{use_case_id}_{role}.json"
+            index[(use_case_id, entry['version'], role)] = (profile_path, entry.get('profile_mtime_ns'))
+        return index
+    
+    def _apply_usage(self, registry: Dict, use_case_id: str, version: str,
+                     count: int, timestamp: str) -> bool:
+        """Suma usos a un registry. Retorna False si el Gem no existe"""
+        gem_entry = registry['gems'].get(use_case_id)
+        if gem_entry is None:
+            return False
+        
+        gem_version = gem_entry['versions'].get(version)
+        if gem_version is None:
+            return False
+        
+        if not gem_version.get('last_used') or timestamp > gem_version['last_used']:
+            gem_version['last_used'] = timestamp
+        gem_version['usage_count'] = gem_version.get('usage_count', 0) + count
+        return True
+    
+    def _update_registry(self, change: Optional[Callable[[Dict], bool]] = None) -> bool:
+        """
+        Aplica un cambio al registry sin pisar lo escrito por otros procesos.
+        
+        Bajo bloqueo: recarga el registry de disco, suma los usos pendientes
+        propios, aplica change (si retorna False no hubo cambio) y escribe
+        una vez. Retorna el resultado de change.
+        """
+        pending = Counter(self._pending_usage)
+        
+        with self._registry_lock():
+            registry = self._load_registry()
+            for (use_case_id, version), count in pending.items():
+                self._apply_usage(registry, use_case_id, version, count,
+                                  self._last_used[(use_case_id, version)])
+            changed = change(registry) if change is not None else True
+            self.registry = registry
+            if changed or pending:
+                self._save_registry()
+        
+        # Solo tras escribir: si la escritura falla, los usos siguen pendientes
+        self._pending_usage -= pending
+        for key in pending:
+            if key not in self._pending_usage:
+                del self._last_used[key]
+        self._profile_index = self._build_profile_index()
+        return changed
+    
+    def flush_usage(self):
+        """Vuelca los usos acumulados al registry"""
+        if self._pending_usage:
+            self._update_registry()
+    
+    def close(self):
+        """Vuelca usos pendientes al registry"""
+        self.flush_usage()
     
     def register_gem(
         self,
@@ -60,52 +187,51 @@ class GemRegistry:
         use_case_id = gem_metadata['use_case_id']
         version = gem_metadata['version']
         
-        # Verificar si ya existe
-        if use_case_id in self.registry['gems']:
-            existing_versions = self.registry['gems'][use_case_id].get('versions', {})
-            if version in existing_versions and not force:
-                print(f"⚠️  Gem {use_case_id} v{version} ya registrado. Use force=True para sobrescribir.")
-                return False
-        
-        # Calcular hash del archivo
+        # Calcular hash del archivo (fuera del bloqueo)
         with open(gem_path, 'rb') as f:
             file_hash = hashlib.sha256(f.read()).hexdigest()
         
-        # Registrar
-        if use_case_id not in self.registry['gems']:
-            self.registry['gems'][use_case_id] = {
-                "name": use_case_id,
-                "versions": {},
-                "latest_version": version
+        def register(registry: Dict) -> bool:
+            # Verificar si ya existe (sobre el registry recién recargado)
+            gem_entry = registry['gems'].get(use_case_id)
+            if gem_entry is not None and version in gem_entry.get('versions', {}) and not force:
+                return False
+            
+            if gem_entry is None:
+                gem_entry = registry['gems'][use_case_id] = {
+                    "name": use_case_id,
+                    "versions": {},
+                    "latest_version": version
+                }
+            
+            gem_entry['versions'][version] = {
+                "file_path": gem_path,
+                "file_hash": file_hash,
+                "model": gem_metadata['model'],
+                "risk_score": gem_metadata['risk_score'],
+                "registered_at": _iso_utc(),
+                "last_used": None,
+                "usage_count": 0
             }
+            
+            # Actualizar latest_version si es mayor (SemVer)
+            if self._is_newer_version(version, gem_entry['latest_version']):
+                gem_entry['latest_version'] = version
+            return True
         
-        self.registry['gems'][use_case_id]['versions'][version] = {
-            "file_path": gem_path,
-            "file_hash": file_hash,
-            "model": gem_metadata['model'],
-            "risk_score": gem_metadata['risk_score'],
-            "registered_at": datetime.utcnow().isoformat() + "Z",
-            "last_used": None,
-            "usage_count": 0
-        }
-        
-        # Actualizar latest_version si es mayor (SemVer)
-        if self._is_newer_version(version, self.registry['gems'][use_case_id]['latest_version']):
-            self.registry['gems'][use_case_id]['latest_version'] = version
+        if not self._update_registry(register):
+            print(f"⚠️  Gem {use_case_id} v{version} ya registrado. Use force=True para sobrescribir.")
+            return False
         
-        self._save_registry()
         print(f"✓ Gem registrado: {use_case_id} v{version}")
         return True
     
     def _is_newer_version(self, v1: str, v2: str) -> bool:
         """Compara versiones SemVer (simple)"""
-        def parse_version(v):
-            return tuple(map(int, v.split('.')))
-        
-        try:
-            return parse_version(v1) > parse_version(v2)
-        except:
+        key1, key2 = _semver_key(v1)[0], _semver_key(v2)[0]
+        if key1 < 0 or key2 < 0:
             return False
+        return key1 > key2
     
     def get_gem(self, use_case_id: str, version: Optional[str] = None) -> Optional[Dict]:
         """
@@ -118,71 +244,104 @@ class GemRegistry:
         Returns:
             Metadata del Gem o None
         """
-        if use_case_id not in self.registry['gems']:
+        gem_entry = self.registry['gems'].get(use_case_id)
+        if gem_entry is None:
             return None
         
-        gem_entry = self.registry['gems'][use_case_id]
-        
         if version is None:
             version = gem_entry['latest_version']
         
-        if version not in gem_entry['versions']:
+        version_data = gem_entry['versions'].get(version)
+        if version_data is None:
             return None
         
         return {
             "use_case_id": use_case_id,
             "version": version,
-            **gem_entry['versions'][version]
+            **version_data
         }
     
     def list_gems(self) -> List[Dict]:
         """Lista todos los Gems registrados"""
-        gems = []
-        for use_case_id, gem_data in self.registry['gems'].items():
-            for version, version_data in gem_data['versions'].items():
-                gems.append({
-                    "use_case_id": use_case_id,
-                    "version": version,
-                    "is_latest": version == gem_data['latest_version'],
-                    **version_data
-                })
-        return sorted(gems, key=lambda x: (x['use_case_id'], x['version']))
+        # Se ordenan solo las claves (use_case_id, version SemVer) en lugar de
+        # la lista final de dicts, así la salida sale ya ordenada en una pasada
+        return [
+            {
+                "use_case_id": use_case_id,
+                "version": version,
+                "is_latest": version == gem_data['latest_version'],
+                **gem_data['versions'][version]
+            }
+            for use_case_id, gem_data in sorted(self.registry['gems'].items())
+            for version in sorted(gem_data['versions'], key=_semver_key)
+        ]
     
     def record_usage(self, use_case_id: str, version: str):
-        """Registra uso de un Gem"""
-        if use_case_id not in self.registry['gems']:
-            return
+        """
+        Registra uso de un Gem.
         
-        if version not in self.registry['gems'][use_case_id]['versions']:
+        Los usos se acumulan en un Counter en memoria; el registry solo se
+        reescribe cada USAGE_FLUSH_EVERY usos, al cerrar o al salir.
+        """
+        timestamp = _iso_utc()
+        if not self._apply_usage(self.registry, use_case_id, version, 1, timestamp):
             return
         
-        gem_version = self.registry['gems'][use_case_id]['versions'][version]
-        gem_version['last_used'] = datetime.utcnow().isoformat() + "Z"
-        gem_version['usage_count'] = gem_version.get('usage_count', 0) + 1
+        key = (use_case_id, version)
+        self._pending_usage[key] += 1
+        self._last_used[key] = timestamp
         
-        self._save_registry()
+        if not self._close_registered:
+            atexit.register(self.close)
+            self._close_registered = True
+        
+        if sum(self._pending_usage.values()) >= USAGE_FLUSH_EVERY:
+            self.flush_usage()
     
-    def cache_profile(self, use_case_id: str, version: str, role: str, profile: Dict):
+    def cache_profile(
+        self,
+        use_case_id: str,
+        version: str,
+        role: str,
+        profile: Dict,
+        profile_path: Optional[str] = None
+    ):
         """
         Cachea un Agent Profile generado desde un Gem.
         
         Evita regenerar profiles cada vez que se carga el mismo Gem.
+        
+        Args:
+            profile_path: Path donde se guardó el profile
+                          (None = config/gem_profiles/<use_case_id>_<role>.json)
         """
         cache_key = f"{use_case_id}_{version}_{role}"
+        if profile_path is None:
+            profile_path = f"config/gem_profiles/{use_case_id}_{role}.json"
+        
+        try:
+            profile_mtime_ns = os.stat(profile_path).st_mtime_ns
+        except OSError:
+            profile_mtime_ns = None
         
-        # Calcular hash del profile
-        profile_str = json.dumps(profile, sort_keys=True)
-        profile_hash = hashlib.sha256(profile_str.encode()).hexdigest()
+        # Calcular hash del profile (JSON canónico compacto, directo a bytes)
+        profile_hash = hashlib.sha256(_dumps_canonical(profile)).hexdigest()
         
-        self.registry['profiles_cache'][cache_key] = {
+        entry = {
             "use_case_id": use_case_id,
             "version": version,
             "role": role,
             "profile_hash": profile_hash,
-            "cached_at": datetime.utcnow().isoformat() + "Z"
+            "profile_path": profile_path,
+            "profile_mtime_ns": profile_mtime_ns,
+            "cached_at": _iso_utc()
         }
         
-        self._save_registry()
+        def cache(registry: Dict) -> bool:
+            registry['profiles_cache'][cache_key] = entry
+            return True
+        
+        self._update_registry(cache)
         print(f"  ✓ Profile cacheado: {cache_key}")
     
     def get_cached_profile(self, use_case_id: str, version: str, role: str) -> Optional[str]:
@@ -192,14 +351,13 @@ class GemRegistry:
         Returns:
             Path al profile cacheado o None
         """
-        cache_key = f"{use_case_id}_{version}_{role}"
-        
-        if cache_key not in self.registry['profiles_cache']:
+        cached = self._profile_index.get((use_case_id, version, role))
+        if cached is None:
             return None
         
-        # Verificar que el archivo existe
-        profile_path = f"config/gem_profiles/{use_case_id}_{role}.json"
-        if not os.path.exists(profile_path):
+        # Verificar que el archivo existe (stat cacheado por proceso)
+        profile_path, profile_mtime_ns = cached
+        if not _stat_ok(profile_path, profile_mtime_ns):
             return None
         
         return profile_path
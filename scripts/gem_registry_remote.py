@@ -9,14 +9,57 @@ Features:
 - Conflict resolution
 """
 import os
-import json
+import asyncio
+import functools
 import hashlib
+import shlex
+import shutil
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, field
 
+# Serializacion JSON compartida (orjson si esta disponible)
+from common import _loads, _dumps_pretty
+
+
+def _file_sha256(f) -> str:
+    """SHA-256 de un archivo binario leído por bloques (sin cargarlo entero)"""
+    if hasattr(hashlib, "file_digest"):  # Python 3.11+
+        return hashlib.file_digest(f, "sha256").hexdigest()
+    
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1 << 16), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _git_blob_oid(path: Path) -> str:
+    """OID que git asignaría al archivo como blob (SHA-1 de 'blob <size>\\0' + contenido)"""
+    digest = hashlib.sha1(b"blob %d\0" % path.stat().st_size)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _capture_streams(capture: str) -> Dict[str, int]:
+    """kwargs de stdout/stderr para subprocess.run según el modo de captura"""
+    return {
+        "stdout": subprocess.PIPE if capture == "both" else subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL if capture == "none" else subprocess.PIPE
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_version(version: str) -> Tuple[int, ...]:
+    """Parsea 'X.Y.Z' a tupla de enteros (cacheado, se repiten mucho)"""
+    parts = version.split(".")
+    return tuple(int(p) for p in parts[:3]) + (0,) * (3 - len(parts))
+
 
 @dataclass
 class RemoteConfig:
@@ -58,15 +101,38 @@ class GemRegistryRemote:
             config_file = self.gems_dir / ".remotes.json"
         
         self.config_file = Path(config_file)
+        self._remotes_blob_hash = None
+        # Serializa escrituras locales cuando se sincronizan varios remotes a la vez
+        self._local_lock = threading.RLock()
         self.remotes = self._load_remotes()
+        
+        # Cache de metadata de gems locales, keyed por (mtime_ns, size)
+        self.gems_cache_file = self.gems_dir / ".gems_cache.json"
+        self._gem_cache = self._load_gem_cache()
+    
+    def _load_gem_cache(self) -> Dict[str, Dict]:
+        """Carga el cache de metadata de gems (vacío si no existe o es inválido)"""
+        if not self.gems_cache_file.exists():
+            return {}
+        
+        try:
+            with open(self.gems_cache_file, 'rb') as f:
+                return _loads(f.read())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_gem_cache(self):
+        """Guarda el cache de metadata de gems"""
+        with open(self.gems_cache_file, 'wb') as f:
+            f.write(_dumps_pretty(self._gem_cache))
     
     def _load_remotes(self) -> Dict[str, RemoteConfig]:
         """Carga configuración de remotes"""
         if not self.config_file.exists():
             return {}
         
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(self.config_file, 'rb') as f:
+            data = _loads(f.read())
         
         return {
             name: RemoteConfig(**config)
@@ -87,8 +153,19 @@ class GemRegistryRemote:
             for name, r in self.remotes.items()
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        blob = _dumps_pretty(data)
+        blob_hash = hash(blob)
+        
+        with self._local_lock:
+            if blob_hash == self._remotes_blob_hash:
+                return  # Sin cambios desde la última escritura
+            
+            # Escritura atómica: temporal + rename
+            tmp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_file, self.config_file)
+            self._remotes_blob_hash = blob_hash
     
     def add_remote(
         self,
@@ -138,40 +215,271 @@ class GemRegistryRemote:
         """Lista todos los remotes configurados"""
         return list(self.remotes.values())
     
-    def _run_git(self, args: List[str], cwd: str = None) -> Tuple[bool, str]:
-        """Ejecuta comando git"""
+    def _run_git(self, args: List[str], cwd: str = None, capture: str = "both") -> Tuple[bool, str]:
+        """
+        Ejecuta comando git.
+        
+        Args:
+            capture: "both" (stdout + stderr), "stderr" (stdout a DEVNULL)
+                     o "none" (ambos a DEVNULL, solo importa el exit code)
+        """
         try:
             result = subprocess.run(
                 ["git"] + args,
                 cwd=cwd,
-                capture_output=True,
-                text=True
+                text=True,
+                **_capture_streams(capture)
+            )
+            return result.returncode == 0, (result.stdout or "") + (result.stderr or "")
+        except FileNotFoundError:
+            return False, "Git no encontrado en el sistema"
+    
+    async def _run_git_async(self, args: List[str], cwd: str = None) -> Tuple[bool, str]:
+        """Ejecuta comando git sin bloquear el event loop"""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
-            return result.returncode == 0, result.stdout + result.stderr
         except FileNotFoundError:
             return False, "Git no encontrado en el sistema"
+        
+        stdout, stderr = await proc.communicate()
+        output = (stdout + stderr).decode('utf-8', errors='replace')
+        return proc.returncode == 0, output
+    
+    def _run_git_chain(
+        self,
+        commands: List[List[str]],
+        cwd: str = None,
+        capture: str = "both"
+    ) -> Tuple[bool, str]:
+        """
+        Ejecuta varios comandos git encadenados con && en una sola shell.
+        
+        Se detiene en el primer comando que falle (igual que llamarlos en
+        secuencia), pero paga un único arranque de proceso. En Windows no hay
+        un quoting seguro para cmd.exe, así que se ejecutan en secuencia sin shell.
+        """
+        if os.name == "nt":
+            output = ""
+            for args in commands:
+                success, out = self._run_git(args, cwd=cwd, capture=capture)
+                output += out
+                if not success:
+                    return False, output
+            return True, output
+        
+        script = " && ".join(shlex.join(["git"] + args) for args in commands)
+        
+        result = subprocess.run(
+            script,
+            shell=True,
+            cwd=cwd,
+            text=True,
+            **_capture_streams(capture)
+        )
+        return result.returncode == 0, (result.stdout or "") + (result.stderr or "")
+    
+    def _mirror_path(self, remote: RemoteConfig) -> Path:
+        """Path del mirror bare persistente de un remote"""
+        return self.gems_dir / ".mirrors" / f"{remote.name}.git"
+    
+    def _mirror_command(self, remote: RemoteConfig) -> Tuple[List[str], str, Path]:
+        """
+        Comando git que pone al día el mirror bare del remote.
+        
+        La primera vez clona (blobless); las siguientes solo hace fetch del
+        branch, reutilizando todos los objetos ya descargados.
+        
+        Returns:
+            (args, cwd, mirror)
+        """
+        mirror = self._mirror_path(remote)
+        
+        if not mirror.exists():
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            return (
+                ["clone", "--bare", "--filter=blob:none", "-b", remote.branch,
+                 remote.url, str(mirror)],
+                str(self.gems_dir),
+                mirror
+            )
+        
+        return (
+            ["fetch", "origin", f"+refs/heads/{remote.branch}:refs/heads/{remote.branch}"],
+            str(mirror),
+            mirror
+        )
+    
+    def _ensure_mirror(self, remote: RemoteConfig) -> Tuple[bool, str, Path]:
+        """Prepara el mirror bare del remote"""
+        args, cwd, mirror = self._mirror_command(remote)
+        success, output = self._run_git(args, cwd=cwd)
+        return success, output, mirror
+    
+    async def _ensure_mirror_async(self, remote: RemoteConfig) -> Tuple[bool, str, Path]:
+        """Como _ensure_mirror, pero sin bloquear el event loop"""
+        args, cwd, mirror = self._mirror_command(remote)
+        success, output = await self._run_git_async(args, cwd=cwd)
+        return success, output, mirror
+    
+    def _add_worktree(self, remote: RemoteConfig, mirror: Path, dest: Path) -> Tuple[bool, str]:
+        """
+        Crea un worktree del mirror con solo remote.path materializado.
+        """
+        return self._run_git_chain([
+            ["-C", str(mirror), "worktree", "add", "--no-checkout", "--detach", str(dest), remote.branch],
+            ["-C", str(dest), "sparse-checkout", "init", "--cone"],
+            ["-C", str(dest), "sparse-checkout", "set", remote.path],
+            ["-C", str(dest), "read-tree", "-mu", "HEAD"],
+        ], capture="stderr")
+    
+    def _remove_worktree(self, mirror: Path, dest: Path):
+        """
+        Elimina un worktree temporal del mirror.
+        
+        `git worktree remove` solo borra los archivos materializados (el
+        sparse checkout de remote.path); el object store queda intacto.
+        """
+        success, _ = self._run_git(["worktree", "remove", "--force", str(dest)], cwd=str(mirror),
+                                   capture="none")
+        
+        if not success:
+            # Worktree a medio crear (no registrado): limpiar a mano
+            shutil.rmtree(dest, ignore_errors=True)
+            self._run_git(["worktree", "prune"], cwd=str(mirror), capture="none")
+    
+    def _list_remote_blobs(self, remote: RemoteConfig, mirror: Path) -> Optional[Dict[str, str]]:
+        """
+        Lista los gems de remote.path en el branch del mirror.
+        
+        Returns:
+            Dict path -> oid del blob, o None si el path no existe
+        """
+        listing = self._read_git(
+            ["ls-tree", "-z", remote.branch, "--", f"{remote.path}/"],
+            cwd=str(mirror)
+        )
+        
+        if not listing:
+            return None
+        
+        blobs = {}
+        for line in filter(None, listing.split("\0")):
+            # Formato: "<mode> <type> <oid>\t<path>"
+            meta, remote_file = line.split("\t", 1)
+            _, obj_type, oid = meta.split()
+            file_name = Path(remote_file).name
+            if obj_type == "blob" and not file_name.startswith(".") and file_name.endswith(".json"):
+                blobs[remote_file] = oid
+        return blobs
+    
+    def _read_git(self, args: List[str], cwd: str) -> Optional[str]:
+        """Ejecuta git y retorna solo stdout (None si falla)"""
+        try:
+            result = subprocess.run(
+                ["git"] + args,
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                encoding='utf-8'
+            )
+        except FileNotFoundError:
+            return None
+        return result.stdout if result.returncode == 0 else None
+    
+    def _iter_blobs(self, mirror: Path, entries: List[Tuple[str, str]]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Lee blobs del mirror con un único proceso `git cat-file --batch`.
+        
+        Args:
+            entries: Lista de (path, oid)
+        
+        Yields:
+            (path, contenido en bytes) por cada blob encontrado
+        """
+        proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=str(mirror),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        try:
+            for path, oid in entries:
+                proc.stdin.write(f"{oid}\n".encode())
+                proc.stdin.flush()
+                
+                # Respuesta: "<oid> <type> <size>\n<data>\n" o "<oid> missing\n"
+                header = proc.stdout.readline().split()
+                if len(header) != 3:
+                    continue
+                data = proc.stdout.read(int(header[2]))
+                proc.stdout.read(1)
+                yield path, data
+        finally:
+            proc.stdin.close()
+            proc.stdout.close()
+            proc.wait()
+    
+    def _scan_gem(self, gem_file: Path) -> Tuple[Path, Dict, bool]:
+        """
+        Obtiene la metadata de un gem, desde cache si no cambió.
+        
+        Returns:
+            (gem_file, entrada de cache, True si hubo que re-leer el archivo)
+        """
+        st = gem_file.stat()
+        cached = self._gem_cache.get(gem_file.name)
+        
+        if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return gem_file, cached, False
+        
+        with open(gem_file, 'rb') as f:
+            # Calcular hash del contenido por bloques
+            content_hash = _file_sha256(f)[:12]
+            f.seek(0)
+            data = _loads(f.read())
+        
+        return gem_file, {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": content_hash,
+            "version": data.get("bundle_meta", {}).get("version", "0.0.0"),
+            "use_case_id": data.get("bundle_meta", {}).get("use_case_id", "unknown")
+        }, True
     
     def _get_local_gems(self) -> Dict[str, Dict]:
-        """Obtiene lista de gems locales con hash"""
-        gems = {}
+        """
+        Obtiene lista de gems locales con hash.
         
-        for gem_file in self.gems_dir.glob("*.json"):
-            if gem_file.name.startswith("."):
-                continue
-            
-            with open(gem_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                data = json.loads(content)
-            
-            # Calcular hash del contenido
-            content_hash = hashlib.sha256(content.encode()).hexdigest()[:12]
-            
-            gems[gem_file.stem] = {
-                "file": str(gem_file),
-                "hash": content_hash,
-                "version": data.get("bundle_meta", {}).get("version", "0.0.0"),
-                "use_case_id": data.get("bundle_meta", {}).get("use_case_id", "unknown")
-            }
+        Solo re-lee (hash + JSON) los archivos cuyo mtime o tamaño cambió
+        desde la última llamada; el resto sale del cache en disco. Las
+        lecturas se reparten en un pool de threads (hashlib libera el GIL).
+        """
+        gem_files = [f for f in self.gems_dir.glob("*.json") if not f.name.startswith(".")]
+        
+        gems = {}
+        cache = {}
+        dirty = False
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for gem_file, entry, changed in executor.map(self._scan_gem, gem_files):
+                dirty = dirty or changed
+                cache[gem_file.name] = entry
+                gems[gem_file.stem] = {
+                    "file": str(gem_file),
+                    "hash": entry["hash"],
+                    "version": entry["version"],
+                    "use_case_id": entry["use_case_id"]
+                }
+        
+        # Persistir si hubo cambios o se eliminaron gems
+        if dirty or len(cache) != len(self._gem_cache):
+            self._gem_cache = cache
+            self._save_gem_cache()
         
         return gems
     
@@ -196,24 +504,61 @@ class GemRegistryRemote:
         remote = self.remotes[remote_name]
         local_gems = self._get_local_gems()
         
+        # Actualizar mirror persistente
+        success, output, mirror = self._ensure_mirror(remote)
+        
+        if not success:
+            return SyncResult(
+                success=False,
+                action="error",
+                message=f"Error sincronizando mirror: {output}"
+            )
+        
+        return self._push_remote(remote, mirror, local_gems, gem_names)
+    
+    def _push_remote(
+        self,
+        remote: RemoteConfig,
+        mirror: Path,
+        local_gems: Dict[str, Dict],
+        gem_names: Optional[List[str]]
+    ) -> SyncResult:
+        """Push de gems a un remote cuyo mirror ya está actualizado"""
+        remote_name = remote.name
+        
         if gem_names is None:
             gem_names = list(local_gems.keys())
         
-        # Crear directorio temporal para clonar
-        temp_dir = self.gems_dir / ".temp_sync"
-        temp_dir.mkdir(exist_ok=True)
+        # Omitir gems cuyo blob ya existe idéntico en el remote
+        remote_blobs = self._list_remote_blobs(remote, mirror) or {}
+        to_push = []
+        for gem_name in gem_names:
+            if gem_name not in local_gems:
+                continue
+            src = Path(local_gems[gem_name]["file"])
+            remote_file = f"{remote.path}/{src.name}"
+            if remote_blobs.get(remote_file) != _git_blob_oid(src):
+                to_push.append((gem_name, src))
         
-        # Clonar repo
-        success, output = self._run_git(
-            ["clone", "--depth", "1", "-b", remote.branch, remote.url, str(temp_dir)],
-            cwd=str(self.gems_dir.parent)
-        )
+        if not to_push:
+            remote.last_sync = datetime.now(timezone.utc).isoformat()
+            self._save_remotes()
+            return SyncResult(
+                success=True,
+                action="up-to-date",
+                message=f"{remote_name} ya tiene todos los gems"
+            )
+        
+        # Crear worktree temporal (uno por remote: pueden sincronizarse en paralelo)
+        temp_dir = self.gems_dir / ".temp_sync" / remote_name
+        success, output = self._add_worktree(remote, mirror, temp_dir)
         
         if not success:
+            self._remove_worktree(mirror, temp_dir)
             return SyncResult(
                 success=False,
                 action="error",
-                message=f"Error clonando repositorio: {output}"
+                message=f"Error preparando worktree: {output}"
             )
         
         # Copiar gems al repo clonado
@@ -221,33 +566,26 @@ class GemRegistryRemote:
         remote_gems_path.mkdir(parents=True, exist_ok=True)
         
         pushed_gems = []
-        for gem_name in gem_names:
-            if gem_name not in local_gems:
-                continue
-            
-            src = Path(local_gems[gem_name]["file"])
+        pushed_paths = []
+        for gem_name, src in to_push:
             dst = remote_gems_path / src.name
             
-            # Copiar archivo
-            with open(src, 'r', encoding='utf-8') as f:
-                content = f.read()
-            with open(dst, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Copiar archivo (copia a nivel kernel, sin decodificar)
+            shutil.copyfile(src, dst)
             
             pushed_gems.append(gem_name)
+            pushed_paths.append(dst.relative_to(temp_dir).as_posix())
         
-        # Git add, commit, push
-        self._run_git(["add", "."], cwd=str(temp_dir))
-        
+        # Git add, commit, push en una sola invocación
         commit_msg = f"Sync gems: {', '.join(pushed_gems)} [{datetime.now(timezone.utc).isoformat()}]"
-        success, _ = self._run_git(["commit", "-m", commit_msg], cwd=str(temp_dir))
+        success, output = self._run_git_chain([
+            ["add", "--"] + pushed_paths,
+            ["commit", "-m", commit_msg],
+            ["push", "origin", f"HEAD:refs/heads/{remote.branch}"],
+        ], cwd=str(temp_dir), capture="stderr")
         
-        if success:
-            success, output = self._run_git(["push"], cwd=str(temp_dir))
-        
-        # Limpiar temp
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        # Limpiar worktree (el mirror se conserva)
+        self._remove_worktree(mirror, temp_dir)
         
         # Actualizar last_sync
         remote.last_sync = datetime.now(timezone.utc).isoformat()
@@ -280,82 +618,79 @@ class GemRegistryRemote:
         
         remote = self.remotes[remote_name]
         
-        # Crear directorio temporal para clonar
-        temp_dir = self.gems_dir / ".temp_sync"
-        
-        # Clonar repo
-        success, output = self._run_git(
-            ["clone", "--depth", "1", "-b", remote.branch, remote.url, str(temp_dir)],
-            cwd=str(self.gems_dir.parent)
-        )
+        # Actualizar mirror persistente (sin working tree)
+        success, output, mirror = self._ensure_mirror(remote)
         
         if not success:
             return SyncResult(
                 success=False,
                 action="error",
-                message=f"Error clonando repositorio: {output}"
+                message=f"Error sincronizando mirror: {output}"
             )
         
-        # Obtener gems del repo
-        remote_gems_path = temp_dir / remote.path
+        return self._pull_remote(remote, mirror, gem_names)
+    
+    def _pull_remote(
+        self,
+        remote: RemoteConfig,
+        mirror: Path,
+        gem_names: Optional[List[str]]
+    ) -> SyncResult:
+        """Pull de gems desde un remote cuyo mirror ya está actualizado"""
+        remote_name = remote.name
+        
+        # Listar gems (path + oid del blob) desde el árbol del branch
+        remote_blobs = self._list_remote_blobs(remote, mirror)
         
-        if not remote_gems_path.exists():
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        if remote_blobs is None:
             return SyncResult(
                 success=False,
                 action="error",
                 message=f"Path '{remote.path}' no existe en el repositorio"
             )
         
+        entries = [
+            (remote_file, oid)
+            for remote_file, oid in remote_blobs.items()
+            if gem_names is None or Path(remote_file).stem in gem_names
+        ]
+        
         pulled_gems = []
         conflicts = []
-        local_gems = self._get_local_gems()
         
-        for gem_file in remote_gems_path.glob("*.json"):
-            if gem_file.name.startswith("."):
-                continue
-            
-            gem_name = gem_file.stem
-            
-            if gem_names is not None and gem_name not in gem_names:
-                continue
-            
-            # Leer gem remoto
-            with open(gem_file, 'r', encoding='utf-8') as f:
-                remote_content = f.read()
-            
-            local_path = self.gems_dir / gem_file.name
-            
-            # Verificar conflictos
-            if local_path.exists():
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    local_content = f.read()
+        # Las escrituras en gems_dir se serializan entre remotes
+        with self._local_lock:
+            # Leer todos los gems remotos sin checkout, en un solo proceso git
+            for remote_file, remote_content in self._iter_blobs(mirror, entries):
+                file_name = Path(remote_file).name
+                gem_name = Path(file_name).stem
+                local_path = self.gems_dir / file_name
                 
-                if local_content != remote_content:
-                    # Hay diferencias - verificar versiones
-                    remote_data = json.loads(remote_content)
-                    local_data = json.loads(local_content)
+                # Verificar conflictos
+                if local_path.exists():
+                    with open(local_path, 'rb') as f:
+                        local_content = f.read()
                     
-                    remote_version = remote_data.get("bundle_meta", {}).get("version", "0.0.0")
-                    local_version = local_data.get("bundle_meta", {}).get("version", "0.0.0")
-                    
-                    # Si versión remota es mayor, actualizar
-                    if self._compare_versions(remote_version, local_version) > 0:
-                        with open(local_path, 'w', encoding='utf-8') as f:
-                            f.write(remote_content)
-                        pulled_gems.append(gem_name)
-                    else:
-                        conflicts.append(gem_name)
-            else:
-                # Gem nuevo, copiar
-                with open(local_path, 'w', encoding='utf-8') as f:
-                    f.write(remote_content)
-                pulled_gems.append(gem_name)
-        
-        # Limpiar temp
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+                    if local_content != remote_content:
+                        # Hay diferencias - verificar versiones
+                        remote_data = _loads(remote_content)
+                        local_data = _loads(local_content)
+                        
+                        remote_version = remote_data.get("bundle_meta", {}).get("version", "0.0.0")
+                        local_version = local_data.get("bundle_meta", {}).get("version", "0.0.0")
+                        
+                        # Si versión remota es mayor, actualizar
+                        if self._compare_versions(remote_version, local_version) > 0:
+                            with open(local_path, 'wb') as f:
+                                f.write(remote_content)
+                            pulled_gems.append(gem_name)
+                        else:
+                            conflicts.append(gem_name)
+                else:
+                    # Gem nuevo, copiar
+                    with open(local_path, 'wb') as f:
+                        f.write(remote_content)
+                    pulled_gems.append(gem_name)
         
         # Actualizar last_sync
         remote.last_sync = datetime.now(timezone.utc).isoformat()
@@ -370,20 +705,85 @@ class GemRegistryRemote:
                     (f", {len(conflicts)} conflictos" if conflicts else "")
         )
     
+    def push_all(
+        self,
+        gem_names: List[str] = None,
+        remote_names: List[str] = None
+    ) -> Dict[str, SyncResult]:
+        """
+        Push gems a varios remotes en paralelo.
+        
+        Args:
+            gem_names: Lista de gems a pushear (None = todos)
+            remote_names: Remotes destino (None = todos los configurados)
+        
+        Returns:
+            Dict remote -> SyncResult
+        """
+        local_gems = self._get_local_gems()
+        return asyncio.run(self._sync_all(
+            remote_names,
+            lambda remote, mirror: self._push_remote(remote, mirror, local_gems, gem_names)
+        ))
+    
+    def pull_all(
+        self,
+        gem_names: List[str] = None,
+        remote_names: List[str] = None
+    ) -> Dict[str, SyncResult]:
+        """
+        Pull gems desde varios remotes en paralelo.
+        
+        Args:
+            gem_names: Lista de gems a pullear (None = todos)
+            remote_names: Remotes origen (None = todos los configurados)
+        
+        Returns:
+            Dict remote -> SyncResult
+        """
+        return asyncio.run(self._sync_all(
+            remote_names,
+            lambda remote, mirror: self._pull_remote(remote, mirror, gem_names)
+        ))
+    
+    async def _sync_all(self, remote_names: Optional[List[str]], sync_remote) -> Dict[str, SyncResult]:
+        """
+        Sincroniza varios remotes a la vez: tiempo total ~ max(remote), no la suma.
+        
+        El fetch del mirror usa subprocess asíncrono; el resto del pipeline
+        de cada remote (worktree, push, lectura de blobs) corre en un thread.
+        """
+        if remote_names is None:
+            remote_names = list(self.remotes.keys())
+        
+        limit = asyncio.Semaphore(max(1, (os.cpu_count() or 1) * 3 // 4))
+        
+        async def sync_one(remote_name: str) -> SyncResult:
+            remote = self.remotes.get(remote_name)
+            if remote is None:
+                return SyncResult(
+                    success=False,
+                    action="error",
+                    message=f"Remote '{remote_name}' no encontrado"
+                )
+            
+            async with limit:
+                success, output, mirror = await self._ensure_mirror_async(remote)
+                if not success:
+                    return SyncResult(
+                        success=False,
+                        action="error",
+                        message=f"Error sincronizando mirror: {output}"
+                    )
+                return await asyncio.to_thread(sync_remote, remote, mirror)
+        
+        results = await asyncio.gather(*(sync_one(name) for name in remote_names))
+        return dict(zip(remote_names, results, strict=True))
+    
     def _compare_versions(self, v1: str, v2: str) -> int:
         """Compara versiones semánticas. Returns: >0 si v1>v2, <0 si v1<v2, 0 si iguales"""
-        def parse(v):
-            parts = v.split(".")
-            return [int(p) for p in parts[:3]] + [0] * (3 - len(parts))
-        
-        p1, p2 = parse(v1), parse(v2)
-        
-        for a, b in zip(p1, p2):
-            if a > b:
-                return 1
-            if a < b:
-                return -1
-        return 0
+        p1, p2 = _parse_version(v1), _parse_version(v2)
+        return (p1 > p2) - (p1 < p2)
     
     def status(self, remote_name: str = None) -> Dict:
         """
@@ -15,30 +15,88 @@ Uso:
 """
 
 import os
+import re
 import json
+import atexit
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional, Tuple
 
+# Serializacion JSON compartida (orjson si esta disponible)
+from common import _loads, _dumps_line
+
+# Timestamp ISO cacheado por segundo (se recalcula solo al cambiar el segundo)
+_ts_second = 0
+_ts_iso = ""
+
+
+def _now_iso() -> str:
+    """Timestamp local ISO-8601 con precisión de segundo, cacheado"""
+    global _ts_second, _ts_iso
+    second = int(time.time())
+    if second != _ts_second:
+        _ts_second = second
+        _ts_iso = datetime.fromtimestamp(second).isoformat()
+    return _ts_iso
+
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 LOGS_DIR = PROJECT_ROOT / "logs"
 RECOVERY_LOG = LOGS_DIR / "recovery_events.jsonl"
+RECOVERY_STATS_CACHE = LOGS_DIR / ".recovery_stats.json"
 
 
 class GracefulRecovery:
     """Manejo de fallos para Multi-Agent System."""
     
+    # Handle append-only reutilizado entre eventos (se abre al primer uso)
+    _log_fh = None
+    
+    # Campos mínimos según el agente (orden usado en los mensajes de error)
+    _REQUIRED_FIELDS = {
+        "architect": ("plan", "steps"),
+        "constructor": ("files_modified", "status"),
+        "auditor": ("security_score", "findings"),
+        "tester": ("tests_passed", "results"),
+        "researcher": ("context", "sources")
+    }
+    _REQUIRED_SETS = {agent: frozenset(fields) for agent, fields in _REQUIRED_FIELDS.items()}
+    
+    # (fragmento del error, template de feedback), en orden de prioridad
+    _FEEDBACK_TEMPLATES = (
+        ("Malformed JSON", "Tu respuesta anterior no era JSON válido. Asegúrate de responder con JSON estructurado."),
+        ("Agent returned None", "No recibí ninguna respuesta. Vuelve a procesar la tarea."),
+        ("Missing required fields", "Tu respuesta está incompleta. Revisa los campos requeridos para el rol {agent_id}.")
+    )
+    
+    # Errores que siempre escalan (una sola pasada, sin lower())
+    _CRITICAL_ERRORS_RE = re.compile(
+        r"security|unauthorized|permission denied|api key|authentication",
+        re.IGNORECASE
+    )
+    
+    @classmethod
+    def _close_log(cls):
+        """Cierra el handle del log de recuperación."""
+        if cls._log_fh is not None:
+            cls._log_fh.close()
+            cls._log_fh = None
+    
     @classmethod
     def _log_recovery_event(cls, event: Dict):
         """Registra evento de recuperación."""
-        LOGS_DIR.mkdir(exist_ok=True)
+        event["timestamp"] = _now_iso()
         
-        event["timestamp"] = datetime.now().isoformat()
+        if cls._log_fh is None:
+            LOGS_DIR.mkdir(exist_ok=True)
+            # Sin buffer: cada evento es un único write() en modo append
+            cls._log_fh = open(RECOVERY_LOG, 'ab', buffering=0)
+            atexit.register(cls._close_log)
         
-        with open(RECOVERY_LOG, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        cls._log_fh.write(_dumps_line(event))
     
     @classmethod
     def validate_agent_response(cls, response: Any, agent_id: str) -> Tuple[bool, str]:
@@ -55,25 +113,18 @@ class GracefulRecovery:
         # 2. Si es string, intentar parsear como JSON
         if isinstance(response, str):
             try:
-                json.loads(response)
-            except json.JSONDecodeError as e:
+                _loads(response)
+            except json.JSONDecodeError as e:  # orjson.JSONDecodeError hereda de esta
                 return False, f"Malformed JSON: {str(e)[:100]}"
         
         # 3. Si es dict, verificar campos mínimos esperados
         if isinstance(response, dict):
-            # Campos mínimos según el agente
-            required_fields = {
-                "architect": ["plan", "steps"],
-                "constructor": ["files_modified", "status"],
-                "auditor": ["security_score", "findings"],
-                "tester": ["tests_passed", "results"],
-                "researcher": ["context", "sources"]
-            }
+            required = cls._REQUIRED_SETS.get(agent_id)
             
-            agent_fields = required_fields.get(agent_id, [])
-            missing = [f for f in agent_fields if f not in response]
-            
-            if missing:
+            # Comprobación por diferencia de conjuntos; la lista ordenada
+            # solo se construye cuando falta algo
+            if required and not required <= response.keys():
+                missing = [f for f in cls._REQUIRED_FIELDS[agent_id] if f not in response]
                 return False, f"Missing required fields: {missing}"
         
         return True, ""
@@ -83,16 +134,10 @@ class GracefulRecovery:
         """
         Genera feedback para reintentar después de un fallo.
         """
-        feedback_templates = {
-            "Malformed JSON": "Tu respuesta anterior no era JSON válido. Asegúrate de responder con JSON estructurado.",
-            "Agent returned None": "No recibí ninguna respuesta. Vuelve a procesar la tarea.",
-            "Missing required fields": f"Tu respuesta está incompleta. Revisa los campos requeridos para el rol {agent_id}."
-        }
-        
         # Encontrar template apropiado
-        for key in feedback_templates:
+        for key, template in cls._FEEDBACK_TEMPLATES:
             if key in error:
-                base_feedback = feedback_templates[key]
+                base_feedback = template.format(agent_id=agent_id)
                 break
         else:
             base_feedback = f"Error en tu respuesta: {error}"
@@ -212,51 +257,73 @@ Si el error persiste, proporciona un mensaje de error descriptivo.
         """
         Determina si un error debe escalarse al usuario.
         """
-        # Errores que siempre escalan
-        critical_errors = [
-            "security",
-            "unauthorized",
-            "permission denied",
-            "api key",
-            "authentication"
-        ]
-        
-        error_lower = error.lower()
-        return any(ce in error_lower for ce in critical_errors)
+        return cls._CRITICAL_ERRORS_RE.search(error) is not None
     
     @classmethod
     def get_recovery_stats(cls) -> Dict:
-        """Obtiene estadísticas de recuperación."""
+        """
+        Obtiene estadísticas de recuperación.
+        
+        Los agregados se guardan junto al offset ya procesado del log, así
+        solo se leen las líneas añadidas desde la última llamada.
+        """
         if not RECOVERY_LOG.exists():
             return {"message": "No recovery events logged"}
         
-        events = []
-        with open(RECOVERY_LOG, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    events.append(json.loads(line))
-                except:
-                    continue
-        
-        if not events:
-            return {"message": "No valid events"}
+        offset, stats = 0, None
+        if RECOVERY_STATS_CACHE.exists():
+            try:
+                with open(RECOVERY_STATS_CACHE, 'rb') as f:
+                    cached = _loads(f.read())
+                offset, stats = cached["offset"], cached["stats"]
+            except (OSError, ValueError, KeyError, TypeError):
+                offset, stats = 0, None
         
-        stats = {
-            "total_events": len(events),
-            "success": len([e for e in events if e.get("status") == "success"]),
-            "retries": len([e for e in events if e.get("status") == "retry"]),
-            "failures": len([e for e in events if e.get("status") == "failed"]),
-            "by_agent": {}
-        }
+        # Log truncado o rotado: recalcular desde el inicio
+        log_size = RECOVERY_LOG.stat().st_size
+        if stats is None or log_size < offset:
+            offset = 0
+            stats = {
+                "total_events": 0,
+                "success": 0,
+                "retries": 0,
+                "failures": 0,
+                "by_agent": {}
+            }
         
-        for event in events:
-            agent = event.get("agent_id", "unknown")
-            if agent not in stats["by_agent"]:
-                stats["by_agent"][agent] = {"success": 0, "retry": 0, "failed": 0}
+        if log_size != offset:
+            totals = {"success": "success", "retry": "retries", "failed": "failures"}
+            by_agent = stats["by_agent"]
             
-            status = event.get("status", "unknown")
-            if status in stats["by_agent"][agent]:
-                stats["by_agent"][agent][status] += 1
+            with open(RECOVERY_LOG, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Línea aún incompleta: se procesa en la próxima llamada
+                    offset += len(line)
+                    
+                    try:
+                        event = _loads(line)
+                    except ValueError:
+                        continue
+                    
+                    stats["total_events"] += 1
+                    status = event.get("status", "unknown")
+                    if status in totals:
+                        stats[totals[status]] += 1
+                    
+                    agent = event.get("agent_id", "unknown")
+                    agent_stats = by_agent.get(agent)
+                    if agent_stats is None:
+                        agent_stats = by_agent[agent] = {"success": 0, "retry": 0, "failed": 0}
+                    if status in agent_stats:
+                        agent_stats[status] += 1
+            
+            with open(RECOVERY_STATS_CACHE, 'wb') as f:
+                f.write(_dumps_line({"offset": offset, "stats": stats}))
+        
+        if not stats["total_events"]:
+            return {"message": "No valid events"}
         
         return stats
 
@@ -9,13 +9,14 @@ Uso: python hitl_gate.py <plan.json> [--check | --interactive]
 import json
 import sys
 import os
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Importar utilidades comunes
 try:
-    from common import Colors, Symbols, log_pass, log_fail, log_warn, log_info, make_header
+    from common import Colors, Symbols, make_header, _loads, _dumps_line
 except ImportError:
     class Colors:
         GREEN = RED = YELLOW = BLUE = CYAN = RESET = BOLD = ''
@@ -23,65 +24,185 @@ except ImportError:
         CHECK = '[OK]'
         CROSS = '[X]'
         WARN = '[!]'
-        INFO = '[i]'
-    def log_pass(msg): print(f"[OK] PASS: {msg}")
-    def log_fail(msg): print(f"[X] FAIL: {msg}")
     def make_header(title, width=60): return f"\n{'=' * width}\n  {title}\n{'=' * width}\n"
+    def _loads(data): return json.loads(data)
+    def _dumps_line(obj): return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
 
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+# Journal de aprobaciones (JSONL, una decision por linea, solo se anexa)
+APPROVAL_FILE = ".hitl_approvals.jsonl"
+# Formato anterior (un JSON reescrito entero); se sigue leyendo como base
+LEGACY_APPROVAL_FILE = ".hitl_approvals.json"
+
+# Vigencia de una aprobacion (24h)
+APPROVAL_TTL_SECONDS = 86400
+
+# Planes mayores a esto (bytes) se leen en streaming si ijson esta disponible
+PLAN_STREAM_THRESHOLD = 1_000_000
+
+# Acciones que siempre requieren aprobacion humana
+WRITE_ACTIONS = frozenset(('write_file', 'delete_file', 'git_commit'))
 
-# Archivo de tokens de aprobacion
-APPROVAL_FILE = ".hitl_approvals.json"
+# Etiquetas de estado ya formateadas (se construyen una vez al importar)
+STATUS_APPROVED = f"{Colors.GREEN}{Symbols.CHECK} Aprobado{Colors.RESET}"
+STATUS_PENDING = f"{Colors.YELLOW}[ ] Pendiente{Colors.RESET}"
+
+# Respuestas aceptadas en request_approval
+RESPONSES_YES = frozenset(('s', 'si', 'yes', 'y'))
+RESPONSES_NO = frozenset(('n', 'no'))
+RESPONSES_VIEW = frozenset(('ver', 'v', 'view'))
 
 
 def load_plan(path: str) -> Dict[str, Any]:
     """Carga el plan JSON desde archivo."""
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(path, 'rb') as f:
+        return _loads(f.read())
 
 
 def load_approvals() -> Dict[str, Any]:
-    """Carga aprobaciones existentes."""
+    """
+    Carga aprobaciones existentes.
+    
+    Parte del archivo anterior (si existe) y aplica el journal en orden:
+    la ultima decision de cada paso es la que vale.
+    """
+    approvals = {"approvals": {}}
+    if os.path.exists(LEGACY_APPROVAL_FILE):
+        with open(LEGACY_APPROVAL_FILE, 'rb') as f:
+            approvals = _loads(f.read())
+    
     if os.path.exists(APPROVAL_FILE):
-        with open(APPROVAL_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"approvals": {}}
+        plans = approvals["approvals"]
+        with open(APPROVAL_FILE, 'rb') as f:
+            for line in f:
+                try:
+                    entry = _loads(line)
+                    plan_id, step_id = entry.pop("plan_id"), entry.pop("step_id")
+                    plans.setdefault(plan_id, {})[step_id] = entry
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    # Linea vacia, cortada por una escritura interrumpida o
+                    # sin plan_id/step_id validos: se ignora el registro
+                    continue
+    
+    return approvals
+
+
+def append_approvals(records: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+    """Anexa decisiones (plan_id, step_id, registro) al journal en una escritura."""
+    if not records:
+        return
+    
+    data = b"".join(
+        _dumps_line({"plan_id": plan_id, "step_id": step_id, **record})
+        for plan_id, step_id, record in records
+    )
+    with open(APPROVAL_FILE, 'ab') as f:
+        f.write(data)
 
 
 def save_approvals(approvals: Dict[str, Any]) -> None:
-    """Guarda aprobaciones."""
-    with open(APPROVAL_FILE, 'w', encoding='utf-8') as f:
-        json.dump(approvals, f, indent=2)
+    """Reescribe el journal completo a partir de un dict de aprobaciones (compacta)."""
+    data = b"".join(
+        _dumps_line({"plan_id": plan_id, "step_id": step_id, **record})
+        for plan_id, steps in approvals["approvals"].items()
+        for step_id, record in steps.items()
+    )
+    
+    # Escritura atomica: temporal + rename
+    tmp_file = APPROVAL_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, APPROVAL_FILE)
 
 
 def get_write_steps(plan: Dict) -> List[Dict]:
     """Obtiene pasos que requieren HITL."""
-    write_actions = ['write_file', 'delete_file', 'git_commit']
-    steps = []
+    write_actions = WRITE_ACTIONS  # local: evita LOAD_GLOBAL por paso
+    return [
+        step for step in plan.get('steps', ())
+        if step.get('hitl_required', False) or step.get('action') in write_actions
+    ]
+
+
+def load_plan_write_steps(path: str) -> Tuple[Dict[str, Any], List[Dict]]:
+    """
+    Carga la cabecera del plan y sus pasos HITL.
+    
+    Planes grandes se recorren con ijson: solo se materializan los pasos
+    de escritura, plan_id y objective, no el plan completo.
     
-    for step in plan.get('steps', []):
-        if step.get('hitl_required', False) or step.get('action') in write_actions:
-            steps.append(step)
+    Returns:
+        (plan con plan_id/objective, pasos que requieren HITL)
+    """
+    if not HAS_IJSON or os.path.getsize(path) <= PLAN_STREAM_THRESHOLD:
+        plan = load_plan(path)
+        return plan, get_write_steps(plan)
     
-    return steps
+    write_actions = WRITE_ACTIONS
+    with open(path, 'rb') as f:
+        write_steps = [
+            step for step in ijson.items(f, 'steps.item', use_float=True)
+            if step.get('hitl_required', False) or step.get('action') in write_actions
+        ]
+        
+        plan = {}
+        for key in ('plan_id', 'objective'):
+            f.seek(0)
+            value = next(ijson.items(f, key, use_float=True), None)
+            if value is not None:
+                plan[key] = value
+    
+    return plan, write_steps
 
 
-def check_step_approval(plan_id: str, step_id: str, approvals: Dict) -> bool:
-    """Verifica si un paso tiene aprobacion valida."""
-    plan_approvals = approvals.get("approvals", {}).get(plan_id, {})
-    step_approval = plan_approvals.get(step_id)
-    
-    if not step_approval:
-        return False
+def _approval_expiry(step_approval: Dict) -> Optional[int]:
+    """Epoch de expiracion de una aprobacion (None si no se puede determinar)."""
+    expires_at_epoch = step_approval.get("expires_at_epoch")
+    if expires_at_epoch is not None:
+        return expires_at_epoch
     
-    # Verificar que no haya expirado (24h)
+    # Aprobaciones antiguas sin epoch: parsear approved_at
     try:
         approved_at = datetime.fromisoformat(step_approval.get("approved_at", ""))
-        if (datetime.now() - approved_at).total_seconds() > 86400:
+    except (TypeError, ValueError):
+        return None
+    return int(approved_at.timestamp()) + APPROVAL_TTL_SECONDS
+
+
+def make_approval_checker(plan_id: str, approvals: Dict) -> Callable[[str], bool]:
+    """
+    Crea un verificador de aprobaciones para un plan.
+    
+    Resuelve las aprobaciones del plan y el instante actual una sola vez;
+    cada llamada posterior es un lookup por step_id y una comparacion entera.
+    """
+    plan_approvals = approvals.get("approvals", {}).get(plan_id, {})
+    now = time.time()
+    
+    def check(step_id: str) -> bool:
+        step_approval = plan_approvals.get(step_id)
+        if not step_approval:
             return False
-    except:
-        return False
+        
+        # Verificar que no haya expirado (24h)
+        expires_at_epoch = _approval_expiry(step_approval)
+        if expires_at_epoch is None or now > expires_at_epoch:
+            return False
+        
+        return step_approval.get("approved", False)
     
-    return step_approval.get("approved", False)
+    return check
+
+
+def check_step_approval(plan_id: str, step_id: str, approvals: Dict) -> bool:
+    """Verifica si un paso tiene aprobacion valida."""
+    return make_approval_checker(plan_id, approvals)(step_id)
 
 
 def request_approval(plan: Dict, step: Dict) -> bool:
@@ -106,11 +227,11 @@ def request_approval(plan: Dict, step: Dict) -> bool:
     while True:
         response = input(f"{Colors.GREEN}Aprobar esta accion? (s/n/ver): {Colors.RESET}").lower().strip()
         
-        if response in ['s', 'si', 'yes', 'y']:
+        if response in RESPONSES_YES:
             return True
-        elif response in ['n', 'no']:
+        elif response in RESPONSES_NO:
             return False
-        elif response in ['ver', 'v', 'view']:
+        elif response in RESPONSES_VIEW:
             print(f"\n{Colors.BLUE}Detalle completo del paso:{Colors.RESET}")
             print(json.dumps(step, indent=2, ensure_ascii=False))
             print()
@@ -118,48 +239,57 @@ def request_approval(plan: Dict, step: Dict) -> bool:
             print(f"{Colors.YELLOW}Respuesta no valida. Usa 's' para aprobar, 'n' para rechazar.{Colors.RESET}")
 
 
-def approve_step(plan_id: str, step_id: str, user: str = "human") -> None:
-    """Registra aprobacion de un paso."""
-    approvals = load_approvals()
+def approve_step(plan_id: str, step_id: str, user: str = "human",
+                 approvals: Optional[Dict] = None,
+                 now: Optional[datetime] = None) -> None:
+    """
+    Registra aprobacion de un paso.
     
-    if plan_id not in approvals["approvals"]:
-        approvals["approvals"][plan_id] = {}
-    
-    approvals["approvals"][plan_id][step_id] = {
+    Si se pasa `approvals`, solo se modifica ese dict en memoria y el
+    llamador anexa la decision despues; si no, se anexa al journal.
+    `now` permite reutilizar el mismo instante para toda una sesion.
+    """
+    if now is None:
+        now = datetime.now()
+    record = {
         "approved": True,
-        "approved_at": datetime.now().isoformat(),
+        "approved_at": now.isoformat(),
+        "expires_at_epoch": int(now.timestamp()) + APPROVAL_TTL_SECONDS,
         "approved_by": user
     }
     
-    save_approvals(approvals)
+    if approvals is None:
+        append_approvals([(plan_id, step_id, record)])
+    else:
+        approvals["approvals"].setdefault(plan_id, {})[step_id] = record
     print(f"{Colors.GREEN}{Symbols.CHECK} Paso {step_id} aprobado y registrado{Colors.RESET}")
 
 
-def reject_step(plan_id: str, step_id: str, reason: str = "") -> None:
-    """Registra rechazo de un paso."""
-    approvals = load_approvals()
-    
-    if plan_id not in approvals["approvals"]:
-        approvals["approvals"][plan_id] = {}
-    
-    approvals["approvals"][plan_id][step_id] = {
+def reject_step(plan_id: str, step_id: str, reason: str = "",
+                approvals: Optional[Dict] = None,
+                now: Optional[datetime] = None) -> None:
+    """Registra rechazo de un paso (ver approve_step para `approvals` y `now`)."""
+    if now is None:
+        now = datetime.now()
+    record = {
         "approved": False,
-        "rejected_at": datetime.now().isoformat(),
+        "rejected_at": now.isoformat(),
         "reason": reason
     }
     
-    save_approvals(approvals)
+    if approvals is None:
+        append_approvals([(plan_id, step_id, record)])
+    else:
+        approvals["approvals"].setdefault(plan_id, {})[step_id] = record
     print(f"{Colors.RED}{Symbols.CROSS} Paso {step_id} rechazado{Colors.RESET}")
 
 
 def check_all_hitl(plan_path: str) -> bool:
     """Verifica todos los pasos HITL de un plan."""
-    plan = load_plan(plan_path)
+    plan, write_steps = load_plan_write_steps(plan_path)
     approvals = load_approvals()
     plan_id = plan.get('plan_id')
     
-    write_steps = get_write_steps(plan)
-    
     if not write_steps:
         print(f"{Colors.GREEN}{Symbols.CHECK} No hay pasos que requieran aprobacion HITL{Colors.RESET}")
         return True
@@ -168,19 +298,28 @@ def check_all_hitl(plan_path: str) -> bool:
     
     all_approved = True
     pending = []
+    lines = []
+    
+    # Nombres usados en cada iteracion, resueltos una vez como locales
+    is_step_approved = make_approval_checker(plan_id, approvals)
+    approved_label, pending_label = STATUS_APPROVED, STATUS_PENDING
+    add_line, add_pending = lines.append, pending.append
     
     for step in write_steps:
-        step_id = step.get('id')
-        is_approved = check_step_approval(plan_id, step_id, approvals)
+        get = step.get
+        step_id = get('id')
+        is_approved = is_step_approved(step_id)
         
-        status = f"{Colors.GREEN}{Symbols.CHECK} Aprobado{Colors.RESET}" if is_approved else f"{Colors.YELLOW}[ ] Pendiente{Colors.RESET}"
-        print(f"  {status} {step_id}: {step.get('action')} -> {step.get('target')}")
+        status = approved_label if is_approved else pending_label
+        add_line(f"  {status} {step_id}: {get('action')} -> {get('target')}\n")
         
         if not is_approved:
             all_approved = False
-            pending.append(step)
+            add_pending(step)
     
-    print()
+    # Una sola escritura para todas las lineas (mas la linea en blanco final)
+    lines.append("\n")
+    sys.stdout.write("".join(lines))
     
     if all_approved:
         print(f"{Colors.GREEN}=== HITL GATE PASSED ==={Colors.RESET}")
@@ -192,28 +331,40 @@ def check_all_hitl(plan_path: str) -> bool:
 
 def interactive_approval(plan_path: str) -> bool:
     """Proceso interactivo de aprobacion de pasos."""
-    plan = load_plan(plan_path)
+    plan, write_steps = load_plan_write_steps(plan_path)
     plan_id = plan.get('plan_id')
     approvals = load_approvals()
     
-    write_steps = get_write_steps(plan)
+    # Un solo instante para todas las decisiones de la sesion (la vigencia
+    # cuenta desde el inicio de la sesion, nunca se alarga)
+    now = datetime.now()
+    is_step_approved = make_approval_checker(plan_id, approvals)
     
-    for step in write_steps:
-        step_id = step.get('id')
-        
-        if check_step_approval(plan_id, step_id, approvals):
-            print(f"{Colors.GREEN}{Symbols.CHECK} {step_id} ya aprobado{Colors.RESET}")
-            continue
-        
-        approved = request_approval(plan, step)
-        
-        if approved:
-            approve_step(plan_id, step_id)
-        else:
-            reason = input(f"{Colors.YELLOW}Razon del rechazo (opcional): {Colors.RESET}").strip()
-            reject_step(plan_id, step_id, reason)
-            print(f"\n{Colors.RED}Proceso de aprobacion detenido por rechazo.{Colors.RESET}")
-            return False
+    # Las decisiones se acumulan en memoria y se anexan al journal en una
+    # sola escritura (tambien si el proceso se interrumpe a mitad de la sesion)
+    decided = []
+    try:
+        for step in write_steps:
+            step_id = step.get('id')
+            
+            if is_step_approved(step_id):
+                print(f"{Colors.GREEN}{Symbols.CHECK} {step_id} ya aprobado{Colors.RESET}")
+                continue
+            
+            approved = request_approval(plan, step)
+            
+            if approved:
+                approve_step(plan_id, step_id, approvals=approvals, now=now)
+                decided.append(step_id)
+            else:
+                reason = input(f"{Colors.YELLOW}Razon del rechazo (opcional): {Colors.RESET}").strip()
+                reject_step(plan_id, step_id, reason, approvals=approvals, now=now)
+                decided.append(step_id)
+                print(f"\n{Colors.RED}Proceso de aprobacion detenido por rechazo.{Colors.RESET}")
+                return False
+    finally:
+        plan_approvals = approvals["approvals"].get(plan_id, {})
+        append_approvals([(plan_id, step_id, plan_approvals[step_id]) for step_id in decided])
     
     print(f"\n{Colors.GREEN}=== TODOS LOS PASOS APROBADOS ==={Colors.RESET}")
     return True
@@ -3,23 +3,50 @@
 AGCCE Lint Check
 Ejecuta verificación de estilo y errores comunes en código Python.
 
-Uso: python lint_check.py <archivo_o_directorio>
+Uso: python lint_check.py <archivo_o_directorio> [...]
 """
 
 import subprocess
 import sys
 import os
-from pathlib import Path
-from typing import List, Tuple
+import hashlib
+import json
+import py_compile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
-# Colores para output
-class Colors:
-    GREEN = '\033[92m'
-    RED = '\033[91m'
-    YELLOW = '\033[93m'
-    BLUE = '\033[94m'
-    RESET = '\033[0m'
-    BOLD = '\033[1m'
+try:
+    from flake8.main.application import Application as Flake8Application
+    HAS_FLAKE8 = True
+except ImportError:
+    HAS_FLAKE8 = False
+
+try:
+    from ruff.__main__ import find_ruff_bin
+    HAS_RUFF = True
+except ImportError:
+    HAS_RUFF = False
+
+# Importar utilidades comunes
+try:
+    from common import Colors
+except ImportError:
+    class Colors:
+        GREEN = RED = YELLOW = BLUE = CYAN = RESET = BOLD = ''
+
+
+# Por debajo de este número de archivos no compensa arrancar el pool
+# (ni lanzar flake8 como proceso aparte)
+PARALLEL_COMPILE_MIN_FILES = 32
+
+FLAKE8_ARGS = ["--max-line-length=120", "--ignore=E501,W503"]
+
+# Cache de archivos que ya pasaron la verificación de sintaxis (por contenido)
+LINT_CACHE_FILE = ".lint_cache.json"
+LINT_CACHE_MAX_ENTRIES = 20000
+# El resultado de compilar depende de la versión de Python
+_PYTHON_TAG = f"{sys.version_info[0]}.{sys.version_info[1]}"
 
 
 def run_command(cmd: List[str]) -> Tuple[int, str, str]:
@@ -38,27 +65,116 @@ def run_command(cmd: List[str]) -> Tuple[int, str, str]:
         return -2, "", "Timeout ejecutando comando"
 
 
-def check_syntax(target: str) -> Tuple[bool, str]:
-    """Verifica sintaxis Python básica."""
+def _compile_one(file: str) -> Optional[str]:
+    """Compila un archivo en el proceso actual. Retorna el error o None."""
+    try:
+        py_compile.compile(file, doraise=True, quiet=1)
+    except py_compile.PyCompileError as e:
+        return f"{file}: {e.msg.strip()}"
+    return None
+
+
+def collect_python_files(target: str) -> List[str]:
+    """
+    Lista los archivos .py de un archivo o directorio (un solo recorrido).
+    
+    Recorre con os.scandir (strings y DirEntry, sin objetos Path ni el
+    motor de glob); no sigue symlinks a directorios.
+    """
     if os.path.isfile(target):
-        files = [target]
+        return [target]
+    
+    files = []
+    stack = [target]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    files.append(entry.path)
+    return files
+
+
+def _content_hash(file: str) -> Optional[str]:
+    """BLAKE2b del contenido de un archivo (None si no se puede leer)."""
+    try:
+        with open(file, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _load_lint_cache() -> set:
+    """Carga los hashes de archivos que ya compilaron sin errores."""
+    try:
+        with open(LINT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    
+    if not isinstance(data, dict) or data.get("python") != _PYTHON_TAG:
+        return set()
+    return set(data.get("passed", []))
+
+
+def _save_lint_cache(passed: set) -> None:
+    """Guarda los hashes de archivos que compilaron sin errores."""
+    try:
+        with open(LINT_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"python": _PYTHON_TAG, "passed": sorted(passed)}, f)
+    except OSError:
+        pass  # El cache es opcional
+
+
+def check_syntax(files: List[str]) -> Tuple[bool, str]:
+    """
+    Verifica sintaxis Python básica.
+    
+    Los archivos cuyo contenido ya compiló antes (mismo hash y misma
+    versión de Python) se saltan.
+    """
+    cache = _load_lint_cache()
+    hashes = {file: _content_hash(file) for file in files}
+    to_compile = [file for file in files if hashes[file] not in cache]
+    
+    # Pocos archivos: compilar en este mismo intérprete; muchos: en paralelo
+    if len(to_compile) < PARALLEL_COMPILE_MIN_FILES:
+        results = list(map(_compile_one, to_compile))
     else:
-        files = list(Path(target).rglob("*.py"))
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_compile_one, to_compile, chunksize=16))
     
-    errors = []
-    for file in files:
-        code, stdout, stderr = run_command([sys.executable, "-m", "py_compile", str(file)])
-        if code != 0:
-            errors.append(f"{file}: {stderr.strip()}")
+    errors = [e for e in results if e]
+    passed = {hashes[file] for file, e in zip(to_compile, results, strict=True) if not e and hashes[file]}
+    if passed:
+        # Evitar que el cache crezca sin límite con contenidos ya obsoletos
+        if len(cache) + len(passed) > LINT_CACHE_MAX_ENTRIES:
+            cache = {h for h in hashes.values() if h in cache}
+        _save_lint_cache(cache | passed)
     
     if errors:
         return False, "\n".join(errors)
-    return True, f"Sintaxis OK: {len(files)} archivos verificados"
+    
+    cached = len(files) - len(to_compile)
+    return True, f"Sintaxis OK: {len(files)} archivos verificados ({cached} desde cache)"
 
 
-def check_ruff(target: str) -> Tuple[bool, str]:
+def check_ruff(files: List[str]) -> Tuple[bool, str]:
     """Ejecuta ruff si está disponible."""
-    code, stdout, stderr = run_command(["ruff", "check", target])
+    if not files:
+        return True, "ruff: Sin archivos que verificar"
+    
+    # ruff no tiene API en proceso (es un binario); si está instalado como
+    # paquete Python se usa su binario aunque no esté en el PATH
+    ruff_bin = find_ruff_bin() if HAS_RUFF else "ruff"
+    
+    # --force-exclude: respetar la config de exclusión con paths explícitos
+    code, stdout, stderr = run_command([ruff_bin, "check", "--force-exclude", *files])
     
     if code == -1:
         return True, "ruff no instalado (opcional)"
@@ -69,14 +185,30 @@ def check_ruff(target: str) -> Tuple[bool, str]:
     return False, f"ruff encontró problemas:\n{stdout}"
 
 
-def check_flake8(target: str) -> Tuple[bool, str]:
+def _run_flake8_in_process(files: List[str]) -> Tuple[int, str]:
+    """
+    Ejecuta flake8 en este intérprete (sin arrancar otro proceso).
+    
+    Con --jobs=1 para no hacer fork desde el thread que lo llama.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "flake8.txt")
+        app = Flake8Application()
+        app.run(["--jobs=1", f"--output-file={output_file}", *FLAKE8_ARGS, *files])
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            return app.exit_code(), f.read()
+
+
+def check_flake8(files: List[str]) -> Tuple[bool, str]:
     """Ejecuta flake8 si está disponible."""
-    code, stdout, stderr = run_command([
-        "flake8", 
-        "--max-line-length=120",
-        "--ignore=E501,W503",
-        target
-    ])
+    if not files:
+        return True, "flake8: Sin archivos que verificar"
+    
+    if HAS_FLAKE8 and len(files) < PARALLEL_COMPILE_MIN_FILES:
+        code, stdout = _run_flake8_in_process(files)
+    else:
+        code, stdout, stderr = run_command(["flake8", *FLAKE8_ARGS, *files])
     
     if code == -1:
         return True, "flake8 no instalado (opcional)"
@@ -89,41 +221,53 @@ def check_flake8(target: str) -> Tuple[bool, str]:
 
 def main():
     if len(sys.argv) < 2:
-        print(f"Uso: python {sys.argv[0]} <archivo_o_directorio>")
+        print(f"Uso: python {sys.argv[0]} <archivo_o_directorio> [...]")
         sys.exit(1)
     
-    target = sys.argv[1]
+    targets = sys.argv[1:]
     
-    if not os.path.exists(target):
-        print(f"{Colors.RED}Error: '{target}' no existe{Colors.RESET}")
-        sys.exit(1)
+    for target in targets:
+        if not os.path.exists(target):
+            print(f"{Colors.RED}Error: '{target}' no existe{Colors.RESET}")
+            sys.exit(1)
     
     print(f"\n{Colors.BOLD}══════════════════════════════════════════════════════════")
     print(f"  AGCCE Lint Check v1.0")
     print(f"══════════════════════════════════════════════════════════{Colors.RESET}\n")
     
-    print(f"{Colors.BLUE}ℹ Analizando:{Colors.RESET} {target}\n")
+    print(f"{Colors.BLUE}ℹ Analizando:{Colors.RESET} {', '.join(targets)}\n")
     
     all_passed = True
     results = []
     
-    # Verificación de sintaxis (obligatoria)
-    passed, msg = check_syntax(target)
-    results.append(("Syntax Check", passed, msg))
-    if not passed:
-        all_passed = False
-    
-    # ruff (opcional pero recomendado)
-    passed, msg = check_ruff(target)
-    results.append(("Ruff", passed, msg))
-    if not passed and "no instalado" not in msg:
-        all_passed = False
-    
-    # flake8 (opcional)
-    passed, msg = check_flake8(target)
-    results.append(("Flake8", passed, msg))
-    if not passed and "no instalado" not in msg:
-        all_passed = False
+    # Recorrer cada objetivo una sola vez y pasar la misma lista a los tres
+    # checks: todos los archivos van en una sola pasada de cada herramienta
+    files = [file for target in targets for file in collect_python_files(target)]
+    
+    # ruff y flake8 corren en threads (bloquean en su subprocess) mientras
+    # la verificación de sintaxis corre en el thread principal: así su pool
+    # de procesos no se crea desde un thread secundario
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ruff_future = executor.submit(check_ruff, files)
+        flake8_future = executor.submit(check_flake8, files)
+        
+        # Verificación de sintaxis (obligatoria)
+        passed, msg = check_syntax(files)
+        results.append(("Syntax Check", passed, msg))
+        if not passed:
+            all_passed = False
+        
+        # ruff (opcional pero recomendado)
+        passed, msg = ruff_future.result()
+        results.append(("Ruff", passed, msg))
+        if not passed and "no instalado" not in msg:
+            all_passed = False
+        
+        # flake8 (opcional)
+        passed, msg = flake8_future.result()
+        results.append(("Flake8", passed, msg))
+        if not passed and "no instalado" not in msg:
+            all_passed = False
     
     # Mostrar resultados
     print(f"{Colors.BOLD}Resultados:{Colors.RESET}\n")
@@ -5,8 +5,16 @@ Colector de metricas asincrono para observabilidad.
 
 TELEMETRY CONTRACT: AGCCE-OBS-V1
 - Persistencia: logs/telemetry.jsonl (append-only)
-- Retencion: 30 dias
+- Rotacion: al cambiar de mes el log pasa a logs/telemetry-YYYY-MM.jsonl
+- Retencion: 30 dias (cleanup borra los meses rotados vencidos)
 - Zero-latency: Collector asincrono
+- Backpressure: Cola acotada (TELEMETRY_QUEUE_MAX); si se llena se descarta
+  la entrada nueva (drop-newest) y el worker registra el total descartado
+  como entrada "telemetry.dropped"
+- Durabilidad: group-commit en telemetria (un write por lote, sin fsync;
+  solo fsync al cerrar el interprete). El log de seguridad hace fsync tras
+  cada lote en su propio hilo: ningun evento se confirma sin estar en disco
+  y el productor nunca espera el fsync
 - Project-aware: Cada entrada incluye project_id
 
 Uso:
@@ -15,35 +23,118 @@ Uso:
   Telemetry.record_plan_generated(success=True, attempts=1, latency_ms=150)
 """
 
+import atexit
+import glob
 import json
+import mmap
 import os
 import sys
 import time
 import threading
 import subprocess
-from queue import Queue
+from queue import Empty, Full, Queue
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+# Serializacion JSON compartida (orjson si esta disponible)
+from common import _loads, _dumps_line
+
 # Configuracion
 TELEMETRY_FILE = "logs/telemetry.jsonl"
 SECURITY_LOG_FILE = "logs/security_events.jsonl"
 RETENTION_DAYS = 30
 TELEMETRY_CONTRACT = "AGCCE-OBS-V1"
 
-# Cola asincrona para no bloquear pipeline
-_telemetry_queue: Queue = Queue()
+# Cola asincrona (acotada) para no bloquear pipeline
+TELEMETRY_QUEUE_MAX = 10_000
+_telemetry_queue: Queue = Queue(maxsize=TELEMETRY_QUEUE_MAX)
+_dropped_count = 0
+_dropped_lock = threading.Lock()
+
+# Cola del log de seguridad: sin limite, los eventos de auditoria no se descartan
+_security_queue: Queue = Queue()
+_security_worker_started = False
 _worker_started = False
+_worker_lock = threading.Lock()  # Arranque unico de los workers
+_worker_thread: Optional[threading.Thread] = None
+_security_worker_thread: Optional[threading.Thread] = None
+TELEMETRY_SHUTDOWN_TIMEOUT = 5  # segundos de espera por worker al salir
 _current_project: str = None  # Proyecto activo
 _current_agent: str = None  # Agente activo (v4.0 MAS)
 
+# Maximo de entradas que el worker agrupa en una sola escritura
+TELEMETRY_BATCH_MAX = 500
+
+# Cache del branch actual (evita lanzar git en cada metrica)
+BRANCH_CACHE_TTL = 30  # segundos
+_branch_cache: Optional[str] = None
+_branch_cache_ts = 0.0
+
+# Dimensiones fijas durante todo el proceso (se calculan una vez al importar)
+_BASE_DIMENSIONS = {
+    "model_id": "gemini-2.5-pro",  # Default, puede sobreescribirse
+    "hostname": os.environ.get("COMPUTERNAME", "local"),
+}
+
+# Dimensiones completas memoizadas: (branch, dict). set_project/set_agent
+# la invalidan y se reconstruye si cambia el branch
+_dimensions_cache: Optional[tuple] = None
+
+
+def _read_branch_from_head() -> Optional[str]:
+    """
+    Lee el branch actual de .git/HEAD sin lanzar git.
+    
+    Returns:
+        Nombre del branch ("" si HEAD esta detached) o None si no se
+        encuentra el repositorio
+    """
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        git_path = directory / ".git"
+        try:
+            if git_path.is_dir():
+                head_file = git_path / "HEAD"
+            elif git_path.is_file():
+                # Worktree o submodulo: ".git" contiene "gitdir: <path>"
+                content = git_path.read_text(encoding='utf-8').strip()
+                if not content.startswith("gitdir:"):
+                    return None
+                head_file = directory / content[len("gitdir:"):].strip() / "HEAD"
+            else:
+                continue
+            
+            head = head_file.read_text(encoding='utf-8').strip()
+        except OSError:
+            return None
+        
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        return ""  # Igual que `git branch --show-current` con HEAD detached
+    return None
+
 
 def _get_branch_name() -> str:
-    """Obtiene nombre del branch actual."""
+    """Obtiene nombre del branch actual (cacheado BRANCH_CACHE_TTL segundos)."""
+    global _branch_cache, _branch_cache_ts
+    now = time.monotonic()
+    if _branch_cache is not None and now - _branch_cache_ts < BRANCH_CACHE_TTL:
+        return _branch_cache
+    
+    branch = _read_branch_from_head()
+    if branch is None:
+        branch = _get_branch_name_from_git()
+    
+    _branch_cache, _branch_cache_ts = branch, now
+    return branch
+
+
+def _get_branch_name_from_git() -> str:
+    """Obtiene nombre del branch actual lanzando git."""
     try:
         result = subprocess.run(
-            ["git", "branch", "--show-current"],
+            ["git", "--no-optional-locks", "branch", "--show-current"],
             capture_output=True, text=True, timeout=5,
             encoding='utf-8', errors='replace'
         )
@@ -52,38 +143,253 @@ def _get_branch_name() -> str:
         return "unknown"
 
 
+def _get_project_from_cwd() -> str:
+    """Proyecto por defecto: nombre del directorio de trabajo."""
+    return os.path.basename(os.getcwd()) or "unknown"
+
+
+def _format_timestamps(entries: List[Dict]) -> None:
+    """
+    Convierte a ISO-8601 los timestamps en nanosegundos de las entradas.
+    
+    Los productores solo estampan time.time_ns(); el formateo se hace
+    aqui, en el hilo del worker.
+    """
+    for entry in entries:
+        ts = entry.get("timestamp")
+        if type(ts) is int:
+            seconds, nanos = divmod(ts, 1_000_000_000)
+            entry["timestamp"] = datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000).isoformat()
+
+
 def _ensure_log_dir():
     """Crea directorio de logs si no existe."""
     os.makedirs("logs", exist_ok=True)
 
 
-def _append_to_log(filepath: str, entry: Dict) -> None:
-    """Append entry to JSONL file (thread-safe)."""
+# O_APPEND: cada os.write se anexa al final de forma atomica aunque varios
+# procesos escriban el mismo log (O_BINARY evita traducir \n en Windows)
+_APPEND_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+
+
+def _open_append(filepath: str) -> int:
+    """Abre el log para anexar y retorna el descriptor."""
     _ensure_log_dir()
-    with open(filepath, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    return os.open(filepath, _APPEND_FLAGS, 0o644)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Escribe el buffer con un solo os.write (reintenta solo si es parcial)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _append_to_log(filepath: str, entry: Dict) -> None:
+    """Append entry to JSONL file (una sola escritura O_APPEND)."""
+    fd = _open_append(filepath)
+    try:
+        _write_all(fd, _dumps_line(entry))
+    finally:
+        os.close(fd)
+
+
+def _rotate_log(filepath: str, month: str) -> None:
+    """Archiva el log activo como <nombre>-YYYY-MM<ext> sin pisar archivos existentes."""
+    stem, ext = os.path.splitext(filepath)
+    archive = f"{stem}-{month}{ext}"
+    n = 1
+    while os.path.exists(archive):
+        archive = f"{stem}-{month}.{n}{ext}"
+        n += 1
+    try:
+        os.rename(filepath, archive)
+    except OSError:
+        pass  # Otro proceso ya lo roto
+
+
+def _current_log(fd: Optional[int], filepath: str) -> int:
+    """
+    Devuelve el descriptor (O_APPEND) del log activo, rotandolo al cambiar de mes.
+    
+    Si la ultima escritura del archivo es de un mes anterior se renombra
+    (O(1)) antes de reabrir. Tambien reabre si otro proceso lo roto, para
+    no seguir anexando a un archivo ya renombrado.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        st = None
+    
+    if st is not None:
+        month = time.strftime('%Y-%m', time.localtime(st.st_mtime))
+        if month != time.strftime('%Y-%m'):
+            if fd is not None:
+                os.close(fd)  # Windows no renombra archivos abiertos
+                fd = None
+            _rotate_log(filepath, month)
+        elif fd is not None:
+            try:
+                if st.st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except OSError:
+                pass
+    
+    if fd is not None:
+        os.close(fd)
+    return _open_append(filepath)
+
+
+def _archived_logs(filepath: str) -> List[str]:
+    """Archivos rotados de un log (<nombre>-YYYY-MM*<ext>) en orden cronologico."""
+    stem, ext = os.path.splitext(filepath)
+    return sorted(glob.glob(f"{glob.escape(stem)}-[0-9][0-9][0-9][0-9]-[0-9][0-9]*{ext}"))
+
+
+def _archive_month(filepath: str, archive: str) -> str:
+    """Mes (YYYY-MM) codificado en el nombre de un archivo rotado."""
+    offset = len(os.path.splitext(filepath)[0]) + 1
+    return archive[offset:offset + 7]
+
+
+def _take_dropped_count() -> int:
+    """Retorna y reinicia el contador de entradas descartadas."""
+    global _dropped_count
+    with _dropped_lock:
+        dropped, _dropped_count = _dropped_count, 0
+    return dropped
+
+
+def _next_batch(queue: Queue) -> Optional[List]:
+    """Espera una entrada y drena las pendientes (hasta TELEMETRY_BATCH_MAX)."""
+    try:
+        batch = [queue.get(timeout=1)]
+    except Empty:
+        return None
+    
+    while len(batch) < TELEMETRY_BATCH_MAX:
+        try:
+            batch.append(queue.get_nowait())
+        except Empty:
+            break
+    return batch
 
 
 def _telemetry_worker():
-    """Worker asincrono que procesa la cola de telemetria."""
+    """
+    Worker asincrono que procesa la cola de telemetria.
+    
+    Mantiene el descriptor abierto y drena la cola por lotes: todas las
+    entradas pendientes (hasta TELEMETRY_BATCH_MAX) se escriben con un
+    unico os.write sobre O_APPEND. Sin fsync por lote (ver contrato).
+    """
+    fd = None
     while True:
+        batch = _next_batch(_telemetry_queue)
+        if batch is None:
+            continue
+        
+        shutdown = None in batch  # Signal de shutdown
+        entries = [entry for entry in batch if entry is not None]
         try:
-            entry = _telemetry_queue.get(timeout=1)
-            if entry is None:  # Signal de shutdown
-                break
-            _append_to_log(TELEMETRY_FILE, entry)
+            dropped = _take_dropped_count()
+            if dropped:
+                dropped_entry = Telemetry._create_base_entry("telemetry.dropped")
+                dropped_entry["metrics"] = {"dropped_events": dropped}
+                entries.append(dropped_entry)
+            
+            _format_timestamps(entries)
+            fd = _current_log(fd, TELEMETRY_FILE)
+            _write_all(fd, b"".join(map(_dumps_line, entries)))
+            if shutdown:
+                os.fsync(fd)
+        except Exception:
+            pass  # La telemetria nunca debe tumbar al worker
+        
+        for _ in batch:
             _telemetry_queue.task_done()
-        except:
+        
+        if shutdown:
+            break
+    if fd is not None:
+        os.close(fd)
+
+
+def _security_worker():
+    """
+    Worker del log de seguridad (audit trail).
+    
+    Igual que el de telemetria, pero hace fsync tras cada lote: el evento
+    queda en disco sin que el llamador espere la escritura.
+    """
+    fd = None
+    while True:
+        batch = _next_batch(_security_queue)
+        if batch is None:
             continue
+        
+        shutdown = None in batch  # Signal de shutdown
+        entries = [entry for entry in batch if entry is not None]
+        try:
+            _format_timestamps(entries)
+            fd = _current_log(fd, SECURITY_LOG_FILE)
+            _write_all(fd, b"".join(map(_dumps_line, entries)))
+            os.fsync(fd)
+        except Exception:
+            pass  # Nunca tumbar al worker
+        
+        for _ in batch:
+            _security_queue.task_done()
+        
+        if shutdown:
+            break
+    if fd is not None:
+        os.close(fd)
+
+
+def _start_security_worker():
+    """Inicia el worker del log de seguridad si no esta corriendo."""
+    global _security_worker_started, _security_worker_thread
+    if _security_worker_started:
+        return
+    with _worker_lock:
+        if not _security_worker_started:
+            _security_worker_thread = threading.Thread(target=_security_worker, daemon=True)
+            _security_worker_thread.start()
+            _security_worker_started = True
 
 
 def _start_worker():
     """Inicia worker asincrono si no esta corriendo."""
-    global _worker_started
-    if not _worker_started:
-        thread = threading.Thread(target=_telemetry_worker, daemon=True)
-        thread.start()
-        _worker_started = True
+    global _worker_started, _worker_thread
+    if _worker_started:
+        return
+    with _worker_lock:
+        if not _worker_started:
+            _worker_thread = threading.Thread(target=_telemetry_worker, daemon=True)
+            _worker_thread.start()
+            _worker_started = True
+
+
+def _drain_and_shutdown() -> None:
+    """
+    Al salir del interprete envia el sentinel a cada worker y espera a que
+    vacie su cola; los hilos daemon mueren con las entradas pendientes.
+    """
+    for queue, thread in (
+        (_telemetry_queue, _worker_thread),
+        (_security_queue, _security_worker_thread),
+    ):
+        if thread is None or not thread.is_alive():
+            continue
+        try:
+            queue.put(None, timeout=TELEMETRY_SHUTDOWN_TIMEOUT)
+        except Full:
+            continue
+        thread.join(TELEMETRY_SHUTDOWN_TIMEOUT)
+
+
+atexit.register(_drain_and_shutdown)
 
 
 class Telemetry:
@@ -94,37 +400,65 @@ class Telemetry:
     
     @staticmethod
     def _create_base_entry(metric_type: str) -> Dict[str, Any]:
-        """Crea entrada base con dimensiones."""
+        """
+        Crea entrada base con dimensiones.
+        
+        Las dimensiones se memoizan por (proyecto, agente, branch) y cada
+        entrada recibe una copia. El timestamp se estampa en nanosegundos;
+        el worker lo formatea.
+        """
+        global _dimensions_cache
+        branch = _get_branch_name()
+        cache = _dimensions_cache
+        if cache is None or cache[0] != branch:
+            cache = _dimensions_cache = (branch, {
+                "branch_name": branch,
+                **_BASE_DIMENSIONS,
+                "project_id": _current_project or _get_project_from_cwd(),
+                "agent_id": _current_agent or "orchestrator"  # v4.0: Trazabilidad MAS
+            })
+        
         return {
             "contract": TELEMETRY_CONTRACT,
             "type": metric_type,
-            "timestamp": datetime.now().isoformat(),
-            "dimensions": {
-                "branch_name": _get_branch_name(),
-                "model_id": "gemini-2.5-pro",  # Default, puede sobreescribirse
-                "hostname": os.environ.get("COMPUTERNAME", "local"),
-                "project_id": _current_project or _get_project_from_cwd(),
-                "agent_id": _current_agent or "orchestrator"  # v4.0: Trazabilidad MAS
-            }
+            "timestamp": time.time_ns(),
+            "dimensions": cache[1].copy()
         }
     
     @staticmethod
     def set_project(project_id: str) -> None:
         """Establece el proyecto activo para todas las métricas."""
-        global _current_project
+        global _current_project, _dimensions_cache
         _current_project = project_id
+        _dimensions_cache = None
     
     @staticmethod
     def set_agent(agent_id: str) -> None:
         """Establece el agente activo para trazabilidad MAS (v4.0)."""
-        global _current_agent
+        global _current_agent, _dimensions_cache
         _current_agent = agent_id
+        _dimensions_cache = None
     
     @staticmethod
     def record_async(entry: Dict) -> None:
-        """Encola entrada para escritura asincrona."""
+        """
+        Encola entrada para escritura asincrona.
+        
+        Nunca bloquea: si la cola esta llena la entrada se descarta y se
+        cuenta (ver get_dropped_count).
+        """
+        global _dropped_count
         _start_worker()
-        _telemetry_queue.put(entry)
+        try:
+            _telemetry_queue.put_nowait(entry)
+        except Full:
+            with _dropped_lock:
+                _dropped_count += 1
+    
+    @staticmethod
+    def get_dropped_count() -> int:
+        """Entradas descartadas por cola llena aun no registradas por el worker."""
+        return _dropped_count
     
     # ===== RELIABILITY METRICS =====
     
@@ -236,8 +570,10 @@ class Telemetry:
         # Escribir a ambos logs
         Telemetry.record_async(entry)
         
-        # Escribir a security log separado (sincrono para audit trail)
-        _append_to_log(SECURITY_LOG_FILE, entry)
+        # Escribir a security log separado (worker dedicado con fsync); copia propia
+        # porque ambos workers formatean el timestamp in situ
+        _start_security_worker()
+        _security_queue.put(dict(entry))
     
     @staticmethod
     def record_snyk_scan(
@@ -279,6 +615,118 @@ class Telemetry:
         )
 
 
+_TIMESTAMP_KEY = '"timestamp":'
+
+
+def _raw_timestamp(line: str) -> Optional[str]:
+    """
+    Extrae el valor de "timestamp" de una linea JSONL sin parsearla.
+    
+    Las entradas escriben timestamp antes que metrics, asi que la primera
+    aparicion de la clave es la del nivel superior.
+    """
+    key_pos = line.find(_TIMESTAMP_KEY)
+    if key_pos < 0:
+        return None
+    start = line.find('"', key_pos + len(_TIMESTAMP_KEY))
+    end = line.find('"', start + 1)
+    if start < 0 or end < 0:
+        return None
+    return line[start + 1:end]
+
+
+def _summarize_plan_generation(metrics: Dict, summary: Dict, totals: Dict) -> None:
+    """Agrega una entrada reliability.plan_generation."""
+    reliability = summary['reliability']
+    reliability['plans_generated'] += 1
+    if metrics.get('success'):
+        reliability['plans_successful'] += 1
+    reliability['total_self_corrections'] += metrics.get('self_correction_attempts', 0)
+    reliability['hallucinations_blocked'] += metrics.get('hallucinations_blocked', 0)
+    if metrics.get('latency_ms'):
+        totals['plan_latency_sum'] += metrics['latency_ms']
+        totals['plan_latency_n'] += 1
+
+
+def _summarize_rag_indexing(metrics: Dict, summary: Dict, totals: Dict) -> None:
+    """Agrega una entrada performance.rag_indexing."""
+    if metrics.get('latency_ms'):
+        totals['rag_latency_sum'] += metrics['latency_ms']
+        totals['rag_latency_n'] += 1
+    if metrics.get('delta_efficiency_pct'):
+        totals['delta_efficiency_sum'] += metrics['delta_efficiency_pct']
+        totals['delta_efficiency_n'] += 1
+
+
+def _summarize_snyk_scan(metrics: Dict, summary: Dict, totals: Dict) -> None:
+    """Agrega una entrada security.snyk_scan."""
+    security = summary['security']
+    security['snyk_scans'] += 1
+    security['vulnerabilities_found'] += metrics.get('vulnerabilities_found', 0)
+    if metrics.get('blocked_commit'):
+        security['commits_blocked'] += 1
+
+
+def _summarize_security_event(metrics: Dict, summary: Dict, totals: Dict) -> None:
+    """Agrega una entrada security.event."""
+    if metrics.get('event_type') == 'unauthorized_path':
+        summary['security']['unauthorized_paths_blocked'] += 1
+
+
+# Margen al buscar el inicio de la ventana: lineas de procesos distintos
+# pueden llegar al log ligeramente desordenadas
+READ_SEEK_SLACK = timedelta(minutes=5)
+
+
+def _seek_since(mm: mmap.mmap, since_str: str) -> int:
+    """
+    Offset de la primera linea con timestamp >= since_str.
+    
+    Busqueda binaria sobre el log mapeado (que se escribe en orden
+    cronologico): solo se decodifican O(log n) lineas.
+    """
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        line_start = mm.rfind(b'\n', 0, (lo + hi) // 2) + 1
+        line_end = mm.find(b'\n', line_start)
+        if line_end < 0:
+            line_end = len(mm)
+        
+        raw_timestamp = _raw_timestamp(mm[line_start:line_end].decode('utf-8', errors='replace'))
+        if raw_timestamp is not None and raw_timestamp < since_str:
+            lo = line_end + 1
+        else:
+            hi = line_start  # Sin timestamp: conservar (el filtro fino decide)
+    return min(lo, len(mm))
+
+
+def _read_lines(filepath: str, since: datetime = None) -> List[str]:
+    """
+    Lineas de un log; con since solo desde el inicio aproximado de la ventana.
+    
+    El archivo se mapea con mmap y las lineas antiguas no se decodifican.
+    """
+    with open(filepath, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []  # Archivo vacio
+    
+    with mm:
+        start = _seek_since(mm, (since - READ_SEEK_SLACK).isoformat()) if since else 0
+        # split('\n') y no splitlines(): U+2028 puede ir sin escapar en el JSON
+        return mm[start:].decode('utf-8', errors='replace').split('\n')
+
+
+# Agregador de get_summary por tipo de entrada
+_SUMMARY_HANDLERS = {
+    'reliability.plan_generation': _summarize_plan_generation,
+    'performance.rag_indexing': _summarize_rag_indexing,
+    'security.snyk_scan': _summarize_snyk_scan,
+    'security.event': _summarize_security_event,
+}
+
+
 class TelemetryReader:
     """Clase para leer y agregar metricas."""
     
@@ -288,24 +736,44 @@ class TelemetryReader:
         since: datetime = None,
         entry_type: str = None
     ) -> List[Dict]:
-        """Lee entradas del log con filtros opcionales."""
+        """
+        Lee entradas del log con filtros opcionales.
+        
+        Incluye los archivos rotados (<nombre>-YYYY-MM) cuyo mes no es
+        anterior a since; en cada uno se salta con mmap a la ventana. El
+        filtro por fecha se aplica sobre el texto de la linea (ISO-8601
+        ordena igual como string), antes de parsear.
+        """
         entries = []
         
-        if not os.path.exists(filepath):
-            return entries
+        since_str = since.isoformat() if since else None
+        since_month = since_str[:7] if since_str else ''
+        
+        files = [
+            archive for archive in _archived_logs(filepath)
+            if _archive_month(filepath, archive) >= since_month
+        ]
+        if os.path.exists(filepath):
+            files.append(filepath)
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
+        for path in files:
+            for line in _read_lines(path, since):
                 line = line.strip()
                 if not line:
                     continue
+                
+                # Filtrar por fecha sin parsear la linea
+                raw_timestamp = _raw_timestamp(line) if since_str else None
+                if raw_timestamp is not None and raw_timestamp < since_str:
+                    continue
+                
                 try:
-                    entry = json.loads(line)
+                    entry = _loads(line)
                     
-                    # Filtrar por fecha
-                    if since:
-                        entry_time = datetime.fromisoformat(entry.get('timestamp', ''))
-                        if entry_time < since:
+                    # Linea sin timestamp reconocible: misma comparacion de strings
+                    if since_str and raw_timestamp is None:
+                        timestamp = entry.get('timestamp')
+                        if not isinstance(timestamp, str) or timestamp < since_str:
                             continue
                     
                     # Filtrar por tipo
@@ -347,38 +815,18 @@ class TelemetryReader:
             }
         }
         
-        plan_latencies = []
-        rag_latencies = []
-        delta_efficiencies = []
+        # Sumas y conteos corrientes (sin acumular listas de valores)
+        totals = dict.fromkeys((
+            "plan_latency_sum", "plan_latency_n",
+            "rag_latency_sum", "rag_latency_n",
+            "delta_efficiency_sum", "delta_efficiency_n"
+        ), 0)
         
+        handlers = _SUMMARY_HANDLERS
         for entry in entries:
-            entry_type = entry.get('type', '')
-            metrics = entry.get('metrics', {})
-            
-            if entry_type == 'reliability.plan_generation':
-                summary['reliability']['plans_generated'] += 1
-                if metrics.get('success'):
-                    summary['reliability']['plans_successful'] += 1
-                summary['reliability']['total_self_corrections'] += metrics.get('self_correction_attempts', 0)
-                summary['reliability']['hallucinations_blocked'] += metrics.get('hallucinations_blocked', 0)
-                if metrics.get('latency_ms'):
-                    plan_latencies.append(metrics['latency_ms'])
-            
-            elif entry_type == 'performance.rag_indexing':
-                if metrics.get('latency_ms'):
-                    rag_latencies.append(metrics['latency_ms'])
-                if metrics.get('delta_efficiency_pct'):
-                    delta_efficiencies.append(metrics['delta_efficiency_pct'])
-            
-            elif entry_type == 'security.snyk_scan':
-                summary['security']['snyk_scans'] += 1
-                summary['security']['vulnerabilities_found'] += metrics.get('vulnerabilities_found', 0)
-                if metrics.get('blocked_commit'):
-                    summary['security']['commits_blocked'] += 1
-            
-            elif entry_type == 'security.event':
-                if metrics.get('event_type') == 'unauthorized_path':
-                    summary['security']['unauthorized_paths_blocked'] += 1
+            handler = handlers.get(entry.get('type', ''))
+            if handler is not None:
+                handler(entry.get('metrics', {}), summary, totals)
         
         # Calcular promedios
         if summary['reliability']['plans_generated'] > 0:
@@ -386,14 +834,20 @@ class TelemetryReader:
                 summary['reliability']['plans_successful'] / summary['reliability']['plans_generated'] * 100, 2
             )
         
-        if plan_latencies:
-            summary['performance']['avg_plan_generation_ms'] = round(sum(plan_latencies) / len(plan_latencies), 2)
+        if totals['plan_latency_n']:
+            summary['performance']['avg_plan_generation_ms'] = round(
+                totals['plan_latency_sum'] / totals['plan_latency_n'], 2
+            )
         
-        if rag_latencies:
-            summary['performance']['avg_rag_indexing_ms'] = round(sum(rag_latencies) / len(rag_latencies), 2)
+        if totals['rag_latency_n']:
+            summary['performance']['avg_rag_indexing_ms'] = round(
+                totals['rag_latency_sum'] / totals['rag_latency_n'], 2
+            )
         
-        if delta_efficiencies:
-            summary['performance']['avg_delta_efficiency_pct'] = round(sum(delta_efficiencies) / len(delta_efficiencies), 2)
+        if totals['delta_efficiency_n']:
+            summary['performance']['avg_delta_efficiency_pct'] = round(
+                totals['delta_efficiency_sum'] / totals['delta_efficiency_n'], 2
+            )
         
         return summary
     
@@ -411,22 +865,24 @@ class TelemetryReader:
 
 
 def cleanup_old_logs(days: int = RETENTION_DAYS) -> int:
-    """Limpia entradas mas antiguas que N dias. Retorna entradas eliminadas."""
-    cutoff = datetime.now() - timedelta(days=days)
+    """
+    Elimina los archivos rotados cuyo mes quedo fuera de retencion.
+    
+    No lee ni reescribe ningun log: el archivo activo no se toca y cada
+    mes rotado se borra entero. Retorna el numero de archivos eliminados.
+    """
+    cutoff_month = (datetime.now() - timedelta(days=days)).strftime('%Y-%m')
     removed = 0
     
     for logfile in [TELEMETRY_FILE, SECURITY_LOG_FILE]:
-        if not os.path.exists(logfile):
-            continue
-        
-        # Leer, filtrar y reescribir
-        entries = TelemetryReader.read_entries(filepath=logfile, since=cutoff)
-        original_count = len(TelemetryReader.read_entries(filepath=logfile))
-        removed += original_count - len(entries)
-        
-        with open(logfile, 'w', encoding='utf-8') as f:
-            for entry in entries:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        for archive in _archived_logs(logfile):
+            if _archive_month(logfile, archive) >= cutoff_month:
+                continue
+            try:
+                os.unlink(archive)
+                removed += 1
+            except OSError:
+                pass
     
     return removed
 
@@ -455,7 +911,7 @@ def main():
     
     elif cmd == "cleanup":
         removed = cleanup_old_logs()
-        print(f"Entradas eliminadas: {removed}")
+        print(f"Archivos eliminados: {removed}")
     
     else:
         print(f"Comando desconocido: {cmd}")
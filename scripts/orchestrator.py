@@ -10,17 +10,22 @@ Soporta:
 Uso: python orchestrator.py <plan.json>
 """
 
+import contextlib
+import importlib
+import io
 import json
 import sys
 import os
 import subprocess
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple, Optional
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Importar utilidades comunes
 try:
-    from common import Colors, Symbols, log_pass, log_fail, log_warn, log_info, make_header, make_box
+    from common import Colors, Symbols, log_pass, log_fail, log_warn, log_info, make_header, make_box, _loads
 except ImportError:
     class Colors:
         GREEN = RED = YELLOW = BLUE = CYAN = MAGENTA = RESET = BOLD = ''
@@ -33,6 +38,7 @@ except ImportError:
     def log_fail(msg): print(f"[X] FAIL: {msg}")
     def make_header(title, width=60): return f"\n{'=' * width}\n  {title}\n{'=' * width}\n"
     def make_box(title, width=55): return f"\n  [ {title} ]\n"
+    def _loads(data): return json.loads(data)
 
 # Importar Gem Loader para GemPlans
 try:
@@ -42,6 +48,13 @@ except ImportError:
     HAS_GEM_LOADER = False
     print(f"{Colors.YELLOW}⚠️  Warning: gem_loader.py not found. GemPlan support disabled.{Colors.RESET}")
 
+# Entradas de `git status` que se muestran en el pre-flight
+GIT_STATUS_PREVIEW = 5
+
+# Scripts de fase ejecutados en proceso: se importan una vez y se llama a su main()
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+_MODULE_CACHE: Dict[str, ModuleType] = {}
+
 
 def is_gemplan(plan: Dict) -> bool:
     """Detecta si el plan es un GemPlan o un Plan normal."""
@@ -55,18 +68,218 @@ def load_and_activate_gem(plan: Dict) -> bool:
     Returns:
         True si el Gem se cargó exitosamente
     """
+    if not HAS_GEM_LOADER:
+        print(f"{Colors.RED}Cannot load Gem: gem_loader.py not available{Colors.RESET}")
+        return False
+    
+    try:
+        gem_config = plan["gem_configuration"]
+        gem_path = gem_config["gem_bundle_path"]
+        
+        # Resolver path relativo
+        if not os.path.isabs(gem_path):
+            gem_path = os.path.join(os.getcwd(), gem_path)
+        
+        if not os.path.exists(gem_path):
+            print(f"{Colors.RED}Gem Bundle not found: {gem_path}{Colors.RESET}")
+            return False
+        
+        # Cargar Gem
+        loader = GemLoader()
+        info = loader.get_gem_info(gem_path)
+        
+        print(f"  📦 Gem: {info['use_case_id']} v{info['version']}")
+        print(f"     Compiled: {info['compiled_at']}")
+        print(f"     Model: {info['model']}")
+        print(f"     Risk Score: {info['risk_score']}")
+        print(f"     Model Armor: {'✓ Enabled' if info['has_model_armor'] else '✗ Disabled'}")
+        print(f"     Grounding: {info['grounding_strategy']}")
+        print()
+        
+        # Crear agent profiles
+        output_dir = "config/gem_profiles"
+        profiles = loader.create_agent_profiles_from_gem(gem_path, output_dir)
+        
+        print(f"  ✓ Created {len(profiles)} agent profiles in {output_dir}/")
+        
+        # Marcar que se usan Gem profiles
+        os.environ["AGCCE_USE_GEM_PROFILES"] = "true"
+        os.environ["AGCCE_GEM_USE_CASE_ID"] = info['use_case_id']
+        
+        return True
+    
+    except Exception as e:
+        print(f"{Colors.RED}Error loading Gem: {e}{Colors.RESET}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def _load_script(script: str) -> ModuleType:
+    """Importa (una sola vez) el modulo de un script del proyecto."""
+    name = script[:-3] if script.endswith(".py") else script
+    module = _MODULE_CACHE.get(name)
+    if module is None:
+        if SCRIPTS_DIR not in sys.path:
+            sys.path.insert(0, SCRIPTS_DIR)
+        module = _MODULE_CACHE[name] = importlib.import_module(name)
+    return module
+
+
+def _prefetch_script(script: str) -> threading.Thread:
+    """Importa un script en segundo plano; los errores se reportan al usarlo."""
+    def load():
+        try:
+            _load_script(script)
+        except Exception:
+            pass
+    
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def _call_redirected(func: Callable[[], Any], capture: bool = True,
+                     stream: bool = False) -> Tuple[int, str, Any]:
+    """
+    Llama func con stdout/stderr redirigidos.
+    
+    Retorna (codigo de salida, salida, resultado); el codigo se recupera de
+    SystemExit. Con capture=False la salida se descarta (y se retorna "");
+    con stream=True va directo a la terminal a medida que se produce.
+    """
+    result = None
+    with contextlib.ExitStack() as stack:
+        if not stream:
+            sink = stack.enter_context(
+                io.StringIO() if capture else open(os.devnull, 'w', encoding='utf-8')
+            )
+            stack.enter_context(contextlib.redirect_stdout(sink))
+            stack.enter_context(contextlib.redirect_stderr(sink))
+        try:
+            result = func()
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                print(e.code)
+                returncode = 1
+        except Exception as e:
+            print(f"Error: {e}")
+            returncode = 1
+        output = sink.getvalue() if capture and not stream else ""
+    return returncode, output, result
+
+
+def run_script(script: str, args: List[str], capture: bool = True,
+               stream: bool = False) -> Tuple[bool, str]:
+    """Ejecuta el main() de un script del proyecto dentro del proceso."""
+    saved_argv = sys.argv
+    sys.argv = [f"scripts/{script}"] + args
+    try:
+        returncode, output, _ = _call_redirected(
+            lambda: _load_script(script).main(), capture, stream
+        )
+    finally:
+        sys.argv = saved_argv
+    return returncode == 0, output
+
+
+def _read_git_status(proc: subprocess.Popen, limit: int) -> List[str]:
+    """
+    Lee las primeras `limit` entradas de `git status --porcelain -z`.
+    
+    La salida se consume por bloques hasta tener suficientes registros
+    (separados por NUL, validos con saltos de linea en el nombre) y el
+    proceso se corta sin leer el resto.
+    """
+    records: List[bytes] = []
+    pending = b""
+    # Un rename/copy ocupa dos registros (destino y origen)
+    while len(records) < limit * 2:
+        chunk = proc.stdout.read1(65536)
+        if not chunk:
+            break
+        *complete, pending = (pending + chunk).split(b"\0")
+        records.extend(complete)
+    
+    proc.stdout.close()
+    if proc.poll() is None:
+        proc.kill()
+    proc.wait()
+    
+    changes = []
+    it = iter(records)
+    for record in it:
+        if len(changes) == limit:
+            break
+        line = record.decode('utf-8', errors='replace')
+        if line[:1] in ('R', 'C'):
+            source = next(it, b"").decode('utf-8', errors='replace')
+            line = f"{line[:3]}{source} -> {line[3:]}"
+        changes.append(line)
+    return changes
+
+
+def _existing_files(paths: List[str]) -> List[str]:
+    """
+    Filtra las rutas que existen, conservando su orden.
+    
+    Equivale a os.path.exists por ruta, pero lista cada directorio una sola
+    vez con os.scandir en lugar de hacer un stat por archivo.
+    """
+    listings: Dict[str, set] = {}
+    existing = []
+    for path in paths:
+        directory, name = os.path.split(os.path.normpath(path))
+        if name in ("", ".", ".."):
+            if os.path.exists(path):
+                existing.append(path)
+            continue
+        
+        directory = directory or "."
+        if directory not in listings:
+            try:
+                with os.scandir(directory) as entries:
+                    listings[directory] = {os.path.normcase(e.name) for e in entries}
+            except OSError:
+                listings[directory] = set()
+        
+        if os.path.normcase(name) in listings[directory]:
+            existing.append(path)
+    return existing
+
+
+def phase_pre_flight(plan_path: str, plan: Dict) -> bool:
+    """Fase 1: Pre-flight checks."""
     print(make_header("FASE 1: PRE-FLIGHT CHECK"))
     
+    # 1.1, 1.2 y 1.3 son independientes: git status se lanza primero y corre
+    # mientras la validacion y el lint se ejecutan en proceso; los
+    # resultados (y la pregunta al usuario) se muestran despues en orden.
+    # --no-optional-locks: status no reescribe el indice ni espera index.lock
+    git_status = subprocess.Popen(
+        ["git", "--no-optional-locks", "status", "--porcelain", "-z"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        success, errors, _ = _load_script("validate_plan.py").validate_plan_dict(plan)
+        
+        affected = plan.get("objective", {}).get("affected_files", [])
+        existing = _existing_files(affected)
+        lint_ok = None
+        if success and existing:
+            # Todos los archivos en una sola pasada (lint_check ya paraleliza)
+            lint_ok, _ = run_script("lint_check.py", existing, capture=False)
+    finally:
+        changes = _read_git_status(git_status, GIT_STATUS_PREVIEW)
+    
     # 1.1 Git status
     print(f"{Colors.BLUE}[1.1]{Colors.RESET} Verificando estado de Git...")
-    result = subprocess.run(
-        ["git", "status", "--porcelain"],
-        capture_output=True, text=True,
-        encoding='utf-8', errors='replace'
-    )
-    if result.stdout.strip():
+    if changes:
         print(f"  {Colors.YELLOW}{Symbols.WARN} Hay cambios pendientes en el repositorio{Colors.RESET}")
-        for line in result.stdout.strip().split("\n")[:5]:
+        for line in changes:
             print(f"    {line}")
         response = input(f"\n  {Colors.YELLOW}Continuar de todos modos? (s/n): {Colors.RESET}").lower()
         if response != 's':
@@ -77,27 +290,20 @@ def load_and_activate_gem(plan: Dict) -> bool:
     
     # 1.2 Validar plan
     print(f"\n{Colors.BLUE}[1.2]{Colors.RESET} Validando plan JSON...")
-    success, output = run_script("validate_plan.py", [plan_path])
     if success:
         print(f"  {Colors.GREEN}{Symbols.CHECK} Plan valido segun AGCCE_Plan_v1{Colors.RESET}")
     else:
         print(f"  {Colors.RED}{Symbols.CROSS} Plan invalido{Colors.RESET}")
-        print(output[:500])
+        for error in errors[:10]:
+            print(f"    {error}")
         return False
     
     # 1.3 Lint check de archivos afectados
     print(f"\n{Colors.BLUE}[1.3]{Colors.RESET} Verificando archivos objetivo...")
-    with open(plan_path, 'r', encoding='utf-8') as f:
-        plan = json.load(f)
-    
-    affected = plan.get("objective", {}).get("affected_files", [])
-    existing = [f for f in affected if os.path.exists(f)]
-    
     if existing:
         for file in existing[:3]:
             print(f"  Analizando: {file}")
-        success, output = run_script("lint_check.py", [existing[0]] if existing else ["."])
-        if success:
+        if lint_ok:
             print(f"  {Colors.GREEN}{Symbols.CHECK} Lint check pasado{Colors.RESET}")
         else:
             print(f"  {Colors.YELLOW}{Symbols.WARN} Lint check con warnings{Colors.RESET}")
@@ -108,12 +314,12 @@ def load_and_activate_gem(plan: Dict) -> bool:
     return True
 
 
-def phase_hitl(plan_path: str) -> bool:
+def phase_hitl(plan_path: str, plan: Dict) -> bool:
     """Fase 2: HITL Gate."""
     print(make_header("FASE 2: HITL GATE"))
     
     print(f"{Colors.BLUE}Verificando aprobaciones pendientes...{Colors.RESET}\n")
-    success, output = run_script("hitl_gate.py", [plan_path, "--check"])
+    success, _ = run_script("hitl_gate.py", [plan_path, "--check"], capture=False)
     
     if success:
         print(f"{Colors.GREEN}=== HITL GATE PASSED ==={Colors.RESET}")
@@ -123,39 +329,44 @@ def phase_hitl(plan_path: str) -> bool:
     response = input(f"{Colors.CYAN}Iniciar proceso de aprobacion interactivo? (s/n): {Colors.RESET}").lower()
     
     if response == 's':
-        result = subprocess.run(
-            [sys.executable, "scripts/hitl_gate.py", plan_path, "--interactive"],
-            timeout=600
+        # El colector de la fase 4 se importa mientras el usuario decide
+        _prefetch_script("collect_evidence.py")
+        # Mismo modulo ya importado por --check: sin arrancar otro interprete
+        success, _ = run_script(
+            "hitl_gate.py", [plan_path, "--interactive"], capture=False, stream=True
         )
-        return result.returncode == 0
+        return success
     
     print(f"{Colors.RED}Proceso detenido: aprobaciones pendientes{Colors.RESET}")
     return False
 
 
-def phase_execute(plan_path: str) -> bool:
+def phase_execute(plan_path: str, plan: Dict) -> bool:
     """Fase 3: Ejecucion (simulada - muestra pasos)."""
     print(make_header("FASE 3: EJECUCION DEL PLAN"))
     
-    with open(plan_path, 'r', encoding='utf-8') as f:
-        plan = json.load(f)
-    
     steps = plan.get("steps", [])
     
     print(f"{Colors.CYAN}Plan:{Colors.RESET} {plan.get('plan_id')}")
     print(f"{Colors.CYAN}Pasos:{Colors.RESET} {len(steps)}\n")
     
+    # Todas las lineas de los pasos salen en una sola escritura
+    bold, reset = Colors.BOLD, Colors.RESET
+    lines = []
+    append = lines.append
     for step in steps:
-        step_id = step.get("id")
-        action = step.get("action")
-        target = step.get("target")
-        hitl = "[L]" if step.get("hitl_required") else "[U]"
+        get = step.get
+        hitl = "[L]" if get("hitl_required") else "[U]"
         
-        print(f"  {hitl} {Colors.BOLD}{step_id}{Colors.RESET}: {action}")
-        print(f"      -> {target}")
+        append(f"  {hitl} {bold}{get('id')}{reset}: {get('action')}")
+        append(f"      -> {get('target')}")
         
-        if step.get("depends_on"):
-            print(f"      <- Depende de: {', '.join(step.get('depends_on'))}")
+        depends_on = get("depends_on")
+        if depends_on:
+            append(f"      <- Depende de: {', '.join(depends_on)}")
+    
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
     
     print(f"\n{Colors.YELLOW}{Symbols.WARN} MODO SIMULACION: Los pasos no se ejecutan automaticamente{Colors.RESET}")
     print(f"{Colors.BLUE}Para ejecutar, implemente la logica especifica de cada accion.{Colors.RESET}")
@@ -164,12 +375,19 @@ def phase_execute(plan_path: str) -> bool:
     return True
 
 
-def phase_evidence(plan_path: str) -> bool:
+def phase_evidence(plan_path: str, plan: Dict) -> bool:
     """Fase 4: Recoleccion de evidencia."""
     print(make_header("FASE 4: RECOLECCION DE EVIDENCIA"))
     
     print(f"{Colors.BLUE}Generando reporte de evidencia...{Colors.RESET}\n")
-    success, output = run_script("collect_evidence.py", [plan_path])
+    # Reutiliza el plan ya parseado en lugar de que el colector lo relea;
+    # su progreso se muestra en vivo sin acumularse en memoria
+    collector = _load_script("collect_evidence.py")
+    returncode, _, report = _call_redirected(
+        lambda: collector.generate_evidence_report(plan_path, plan=plan),
+        capture=False, stream=True
+    )
+    success = returncode == 0 and report["evidence_score"]["overall"] == "PASS"
     
     if success:
         print(f"{Colors.GREEN}=== EVIDENCE COLLECTED ==={Colors.RESET}")
@@ -195,9 +413,8 @@ def main():
         print(f"{Colors.RED}Error: '{plan_path}' no existe{Colors.RESET}")
         sys.exit(1)
     
-    # Cargar plan
-    with open(plan_path, 'r', encoding='utf-8') as f:
-        plan = json.load(f)
+    # Cargar plan (una sola vez: las fases reciben el dict ya parseado)
+    plan = _loads(Path(plan_path).read_bytes())
     
     print(make_box("AGCCE ORCHESTRATOR v1.2.0-GEM-ENABLED"))
     
@@ -231,7 +448,7 @@ def main():
     results = []
     for name, phase_func in phases:
         try:
-            success = phase_func(plan_path)
+            success = phase_func(plan_path, plan)
             results.append((name, success))
             
             if not success:
@@ -265,48 +482,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-    if not HAS_GEM_LOADER:
-        print(f"{Colors.RED}Cannot load Gem: gem_loader.py not available{Colors.RESET}")
-        return False
-    
-    try:
-        gem_config = plan["gem_configuration"]
-        gem_path = gem_config["gem_bundle_path"]
-        
-        # Resolver path relativo
-        if not os.path.isabs(gem_path):
-            gem_path = os.path.join(os.getcwd(), gem_path)
-        
-        if not os.path.exists(gem_path):
-            print(f"{Colors.RED}Gem Bundle not found: {gem_path}{Colors.RESET}")
-            return False
-        
-        # Cargar Gem
-        loader = GemLoader()
-        info = loader.get_gem_info(gem_path)
-        
-        print(f"  📦 Gem: {info['use_case_id']} v{info['version']}")
-        print(f"     Compiled: {info['compiled_at']}")
-        print(f"     Model: {info['model']}")
-        print(f"     Risk Score: {info['risk_score']}")
-        print(f"     Model Armor: {'✓ Enabled' if info['has_model_armor'] else '✗ Disabled'}")
-        print(f"     Grounding: {info['grounding_strategy']}")
-        print()
-        
-        # Crear agent profiles
-        output_dir = "config/gem_profiles"
-        profiles = loader.create_agent_profiles_from_gem(gem_path, output_dir)
-        
-        print(f"  ✓ Created {len(profiles)} agent profiles in {output_dir}/")
-        
-        # Marcar que se usan Gem profiles
-        os.environ["AGCCE_USE_GEM_PROFILES"] = "true"
-        os.environ["AGCCE_GEM_USE_CASE_ID"] = info['use_case_id']
-        
-        return True
-    
-    except Exception as e:
-        print(f"{Colors.RED}Error loading Gem: {e}{Colors.RESET}")
-        import traceback
-        traceback.print_exc()
-        return False
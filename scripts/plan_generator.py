@@ -18,7 +18,9 @@ import json
 import re
 import random
 import string
+import traceback
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 
 # Importar utilidades comunes
@@ -39,11 +41,53 @@ except ImportError:
     def make_header(title, width=60): return f"\n{'=' * width}\n  {title}\n{'=' * width}\n"
 
 
+# Validador en proceso (evita relanzar validate_plan.py en cada intento)
+try:
+    from validate_plan import validate_plan_dict
+    HAS_VALIDATOR = True
+except ImportError:
+    HAS_VALIDATOR = False
+
+
 # Configuracion
 MAX_RETRIES = 3
 PLANS_DIR = "plans"
 INDEX_STATE_FILE = ".rag_index_state.json"
 
+# Directorios que nunca se recorren al listar el proyecto (ademas de los ocultos)
+DEFAULT_SKIP_DIRS = frozenset({
+    '.git', '__pycache__', 'node_modules', '.venv', 'venv',
+    '.mypy_cache', '.pytest_cache', '.ruff_cache', '.tox', '.idea', '.vscode',
+    'dist', 'build', 'htmlcov', PLANS_DIR
+})
+
+# Acciones del schema AGCCE_Plan_v1 (mismo set que validate_plan)
+VALID_ACTIONS = frozenset({
+    'read_file', 'write_file', 'delete_file', 'run_command',
+    'docker_compose_up', 'docker_run_tests', 'docker_fetch_logs',
+    'lint_check', 'type_check', 'snyk_scan', 'git_commit'
+})
+WRITE_ACTIONS = frozenset({'write_file', 'delete_file', 'git_commit'})
+
+# Patrones de errores comunes de validate_plan (compilados una sola vez)
+PLAN_ID_RE = re.compile(r'^PLAN-[A-Z0-9]{8}$')
+_VALIDATION_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), error_type)
+    for pattern, error_type in [
+        (r"plan_id invalido", "plan_id"),
+        (r"ID invalido '(\w+)'", "step_id"),
+        (r"falta 'action'", "missing_action"),
+        (r"accion invalida", "invalid_action"),
+        (r"falta 'target'", "missing_target"),
+        (r"hitl_required=true", "hitl_required"),
+        (r"dependencia '(\w+)' no existe", "dependency"),
+        (r"Traceback", "traceback_error"),
+    ]
+]
+
+# Archivos existentes por directorio de trabajo: un solo recorrido por ejecucion
+_EXISTING_FILES_CACHE: Dict[str, frozenset] = {}
+
 
 def generate_plan_id() -> str:
     """Genera un ID unico para el plan."""
@@ -67,72 +111,143 @@ def load_indexed_files() -> List[str]:
 def get_existing_files() -> set:
     """Obtiene set de archivos existentes en el proyecto."""
     existing = set()
-    exclude_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv'}
+    # Recorrido con os.scandir: el tipo de cada DirEntry sale del propio
+    # listado, sin un stat extra por entrada como hace os.walk
+    pending = [('.', '')]
     
-    for root, dirs, files in os.walk('.'):
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        for f in files:
-            path = os.path.join(root, f).replace('\\', '/')
-            if path.startswith('./'):
-                path = path[2:]
-            existing.add(path)
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Poda temprana: no se desciende en los directorios filtrados
+                        if entry.name not in DEFAULT_SKIP_DIRS and not entry.name.startswith('.'):
+                            pending.append((entry.path, f"{prefix}{entry.name}/"))
+                    elif not (entry.is_symlink() and entry.is_dir()):
+                        # Los symlinks a directorios no se siguen (evita ciclos)
+                        existing.add(f"{prefix}{entry.name}")
+        except OSError:
+            continue
     
     return existing
 
 
-def validate_semantic_existence(plan: Dict) -> Tuple[bool, List[str]]:
+def _get_existing_files_cached(refresh: bool = False) -> frozenset:
+    """
+    Retorna get_existing_files() memoizado por directorio de trabajo.
+    
+    Con refresh=True se vuelve a recorrer el arbol (al iniciar cada
+    generacion, para no arrastrar un listado viejo).
+    """
+    cwd = os.getcwd()
+    existing = _EXISTING_FILES_CACHE.get(cwd)
+    if existing is None or refresh:
+        existing = _EXISTING_FILES_CACHE[cwd] = frozenset(get_existing_files())
+    return existing
+
+
+def _norm(path: str) -> str:
+    """Normaliza un path del plan igual que las entradas del listado."""
+    return path.replace('\\', '/').removeprefix('./')
+
+
+@lru_cache(maxsize=4)
+def _known_paths(existing: frozenset, indexed: frozenset) -> frozenset:
+    """
+    Construye el set normalizado de paths conocidos (archivos del proyecto,
+    indice RAG y sus directorios padre), una vez por listado.
+    """
+    known = set()
+    for path in existing | indexed:
+        normalized = _norm(path)
+        known.add(normalized)
+        while '/' in normalized:
+            normalized = normalized.rsplit('/', 1)[0]
+            if normalized in known:
+                break
+            known.add(normalized)
+    return frozenset(known)
+
+
+def _is_known(path: str, known: frozenset) -> bool:
+    """
+    Verifica un path del plan contra los paths conocidos.
+    
+    El set es solo la via rapida: un fallo se confirma contra el filesystem
+    (directorios vacios, paths fuera del proyecto o creados tras el recorrido)
+    antes de darlo por alucinado.
+    """
+    normalized = _norm(path)
+    if not normalized or normalized == '.' or normalized in known:
+        return True
+    return os.path.exists(path)
+
+
+def validate_semantic_existence(plan: Dict, existing: Optional[frozenset] = None) -> Tuple[bool, List[str]]:
     """
     SEMANTIC VERIFICATION - Anti-Alucinacion
     
     Valida que todos los targets/paths mencionados en el plan
     existan realmente en el filesystem o indice RAG.
     
+    Args:
+        plan: Plan a verificar
+        existing: Archivos existentes ya listados (si no, usa el cache)
+    
     Returns:
         Tuple[bool, List[str]]: (passed, hallucinated_paths)
     """
-    existing_files = get_existing_files()
-    indexed_files = set(load_indexed_files())
-    all_known = existing_files | indexed_files
+    known = _known_paths(
+        existing if existing is not None else _get_existing_files_cached(),
+        frozenset(load_indexed_files())
+    )
     
     hallucinated = []
     
     # Verificar affected_files
     for path in plan.get('objective', {}).get('affected_files', []):
-        normalized = path.replace('\\', '/').lstrip('./')
-        if normalized and normalized != '.' and normalized not in all_known:
-            # Verificar si existe realmente en filesystem
-            if not os.path.exists(path):
-                hallucinated.append(f"affected_files: {path}")
+        if not _is_known(path, known):
+            hallucinated.append(f"affected_files: {path}")
     
     # Verificar targets en steps
     for step in plan.get('steps', []):
-        target = step.get('target', '')
         action = step.get('action', '')
         
-        # Solo verificar para acciones de lectura/modificacion de archivos
-        if action in ['read_file', 'write_file', 'delete_file']:
-            normalized = target.replace('\\', '/').lstrip('./')
-            if normalized and normalized != '.' and normalized not in all_known:
-                if not os.path.exists(target):
-                    # Para write_file, el archivo puede no existir aun (sera creado)
-                    if action != 'write_file':
-                        hallucinated.append(f"step {step.get('id')}: {target}")
+        # Solo verificar para acciones de lectura/borrado de archivos:
+        # para write_file, el archivo puede no existir aun (sera creado)
+        if action in ('read_file', 'delete_file') and not _is_known(step.get('target', ''), known):
+            hallucinated.append(f"step {step.get('id')}: {step.get('target', '')}")
     
     # Verificar analyzed_paths en evidence
     for path in plan.get('evidence', {}).get('analyzed_paths', []):
-        normalized = path.replace('\\', '/').lstrip('./')
-        if normalized and normalized != '.' and normalized not in all_known:
-            if not os.path.exists(path):
-                hallucinated.append(f"evidence: {path}")
+        if not _is_known(path, known):
+            hallucinated.append(f"evidence: {path}")
     
     return len(hallucinated) == 0, hallucinated
 
 
-def validate_plan_internal(plan_path: str) -> Tuple[bool, str]:
-    """Valida el plan usando validate_plan.py internamente."""
+def validate_plan_internal(plan: Dict) -> Tuple[bool, str]:
+    """
+    Valida el plan con validate_plan, en proceso si el modulo esta disponible.
+    
+    Retorna (valido, salida) con el texto de errores que espera
+    analyze_validation_errors.
+    """
+    if HAS_VALIDATOR:
+        try:
+            passed, errors, warnings = validate_plan_dict(plan)
+        except Exception:
+            return False, traceback.format_exc()
+        return passed, "\n".join(errors + warnings)
+    
+    # Sin el modulo: se valida una copia temporal con el CLI
+    temp_path = os.path.join(PLANS_DIR, f"_temp_plan_{os.getpid()}.json")
     try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False)
         result = subprocess.run(
-            [sys.executable, "scripts/validate_plan.py", plan_path],
+            [sys.executable, "scripts/validate_plan.py", temp_path],
             capture_output=True,
             text=True,
             timeout=30,
@@ -142,6 +257,11 @@ def validate_plan_internal(plan_path: str) -> Tuple[bool, str]:
         return result.returncode == 0, result.stdout + result.stderr
     except Exception as e:
         return False, str(e)
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
 
 
 def analyze_validation_errors(error_output: str) -> List[str]:
@@ -151,20 +271,8 @@ def analyze_validation_errors(error_output: str) -> List[str]:
     """
     errors = []
     
-    # Patrones de errores comunes
-    patterns = [
-        (r"plan_id invalido", "plan_id"),
-        (r"ID invalido '(\w+)'", "step_id"),
-        (r"falta 'action'", "missing_action"),
-        (r"accion invalida", "invalid_action"),
-        (r"falta 'target'", "missing_target"),
-        (r"hitl_required=true", "hitl_required"),
-        (r"dependencia '(\w+)' no existe", "dependency"),
-        (r"Traceback", "traceback_error"),
-    ]
-    
-    for pattern, error_type in patterns:
-        if re.search(pattern, error_output, re.IGNORECASE):
+    for pattern, error_type in _VALIDATION_PATTERNS:
+        if pattern.search(error_output):
             errors.append(error_type)
     
     # Extraer contexto del traceback para feedback
@@ -175,13 +283,14 @@ def analyze_validation_errors(error_output: str) -> List[str]:
     return errors
 
 
-def fix_plan(plan: Dict, errors: List[str], hallucinated: List[str] = None) -> Dict:
+def fix_plan(plan: Dict, errors: List[str], hallucinated: List[str] = None,
+             existing: Optional[frozenset] = None) -> Dict:
     """
     Intenta corregir errores comunes en el plan.
     MEJORA: Corrige alucinaciones de entidad.
     """
     # Fix plan_id si es invalido
-    if "plan_id" in errors or not re.match(r'^PLAN-[A-Z0-9]{8}$', plan.get('plan_id', '')):
+    if "plan_id" in errors or not PLAN_ID_RE.match(plan.get('plan_id', '')):
         plan['plan_id'] = generate_plan_id()
     
     # Fix step IDs
@@ -196,13 +305,8 @@ def fix_plan(plan: Dict, errors: List[str], hallucinated: List[str] = None) -> D
                 step['action'] = 'read_file'
     
     # Fix invalid actions
-    valid_actions = [
-        'read_file', 'write_file', 'delete_file', 'run_command',
-        'docker_compose_up', 'docker_run_tests', 'docker_fetch_logs',
-        'lint_check', 'type_check', 'snyk_scan', 'git_commit'
-    ]
     for step in plan.get('steps', []):
-        if step.get('action') not in valid_actions:
+        if step.get('action') not in VALID_ACTIONS:
             step['action'] = 'read_file'
     
     # Fix missing targets
@@ -213,33 +317,29 @@ def fix_plan(plan: Dict, errors: List[str], hallucinated: List[str] = None) -> D
     
     # Fix HITL required
     if "hitl_required" in errors:
-        write_actions = ['write_file', 'delete_file', 'git_commit']
         for step in plan.get('steps', []):
-            if step.get('action') in write_actions:
+            if step.get('action') in WRITE_ACTIONS:
                 step['hitl_required'] = True
     
     # FIX ALUCINACIONES: Remover paths inexistentes
     if hallucinated:
-        existing = get_existing_files()
+        known = _known_paths(
+            existing if existing is not None else _get_existing_files_cached(),
+            frozenset(load_indexed_files())
+        )
         
         # Limpiar affected_files
         affected = plan.get('objective', {}).get('affected_files', [])
-        plan['objective']['affected_files'] = [
-            f for f in affected if os.path.exists(f) or f in existing
-        ]
+        plan['objective']['affected_files'] = [f for f in affected if _is_known(f, known)]
         
         # Limpiar analyzed_paths
         analyzed = plan.get('evidence', {}).get('analyzed_paths', [])
-        plan['evidence']['analyzed_paths'] = [
-            f for f in analyzed if os.path.exists(f) or f in existing
-        ]
+        plan['evidence']['analyzed_paths'] = [f for f in analyzed if _is_known(f, known)]
         
         # Corregir targets en steps
         for step in plan.get('steps', []):
-            if step.get('action') == 'read_file':
-                target = step.get('target', '')
-                if not os.path.exists(target) and target != '.':
-                    step['target'] = '.'  # Fallback seguro
+            if step.get('action') == 'read_file' and not _is_known(step.get('target', ''), known):
+                step['target'] = '.'  # Fallback seguro
     
     # Asegurar campos requeridos
     if 'version' not in plan:
@@ -337,6 +437,9 @@ def generate_plan_with_self_correction(
     
     os.makedirs(PLANS_DIR, exist_ok=True)
     
+    # Un solo recorrido del proyecto sirve a todos los intentos
+    existing = _get_existing_files_cached(refresh=True)
+    
     # Generar plan inicial
     print(f"{Colors.BOLD}[1/{MAX_RETRIES + 1}] Generando plan inicial...{Colors.RESET}")
     plan = create_plan_template(objective, affected_files or [])
@@ -346,41 +449,28 @@ def generate_plan_with_self_correction(
         attempt_num = attempt + 1
         print(f"\n{Colors.BOLD}[Intento {attempt_num}/{MAX_RETRIES}]{Colors.RESET}")
         
-        # Guardar plan temporal
-        temp_path = os.path.join(PLANS_DIR, f"_temp_plan_{attempt_num}.json")
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(plan, f, indent=2, ensure_ascii=False)
-        
         # PASO 1: Validacion de estructura
         print(f"  [1/2] Validando estructura...")
-        struct_valid, struct_output = validate_plan_internal(temp_path)
+        struct_valid, struct_output = validate_plan_internal(plan)
         
         if not struct_valid:
             log_warn("Estructura invalida")
             errors = analyze_validation_errors(struct_output)
             print(f"    Errores: {[e for e in errors if not e.startswith('traceback')]}")
-            plan = fix_plan(plan, errors)
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+            plan = fix_plan(plan, errors, existing=existing)
             continue
         
         print(f"    {Colors.GREEN}{Symbols.CHECK}{Colors.RESET} Estructura valida")
         
         # PASO 2: Validacion semantica (anti-alucinacion)
         print(f"  [2/2] Validando semantica (anti-alucinacion)...")
-        semantic_valid, hallucinated = validate_semantic_existence(plan)
+        semantic_valid, hallucinated = validate_semantic_existence(plan, existing)
         
         if not semantic_valid:
             log_warn(f"Alucinacion detectada: {len(hallucinated)} paths inexistentes")
             for h in hallucinated[:5]:
                 print(f"    {Colors.RED}X{Colors.RESET} {h}")
-            plan = fix_plan(plan, ["hallucination"], hallucinated)
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+            plan = fix_plan(plan, ["hallucination"], hallucinated, existing)
             continue
         
         print(f"    {Colors.GREEN}{Symbols.CHECK}{Colors.RESET} Sin alucinaciones")
@@ -390,11 +480,6 @@ def generate_plan_with_self_correction(
         with open(final_path, 'w', encoding='utf-8') as f:
             json.dump(plan, f, indent=2, ensure_ascii=False)
         
-        try:
-            os.remove(temp_path)
-        except:
-            pass
-        
         log_pass(f"Plan generado exitosamente en intento {attempt_num}")
         print(f"\n{Colors.GREEN}=== PLAN GENERATION SUCCESSFUL ==={Colors.RESET}")
         print(f"\n{Colors.BLUE}Plan guardado en:{Colors.RESET} {final_path}\n")
@@ -17,8 +17,10 @@ import subprocess
 import sys
 import os
 import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Tuple, List, Set
+from typing import Callable, Tuple, List, Optional, Set
 
 # Importar utilidades comunes
 try:
@@ -58,6 +60,18 @@ DEPENDENCY_FILES = {
 }
 
 
+# Snyk CLI: override por SNYK_BIN o busqueda en PATH, resuelto una sola vez
+SNYK_BIN = os.environ.get("SNYK_BIN") or shutil.which("snyk") or shutil.which("snyk-win")
+
+
+def _log(messages: Optional[List], func: Callable[[str], None], msg: str) -> None:
+    """Muestra msg, o lo difiere a messages si el check corre en segundo plano."""
+    if messages is None:
+        func(msg)
+    else:
+        messages.append((func, msg))
+
+
 def get_staged_files() -> List[str]:
     """Obtiene lista de archivos staged para commit."""
     result = subprocess.run(
@@ -72,15 +86,18 @@ def get_staged_files() -> List[str]:
     return [f.strip() for f in result.stdout.split('\n') if f.strip()]
 
 
-def get_staged_python_files() -> List[str]:
-    """Obtiene archivos Python staged."""
-    return [f for f in get_staged_files() if f.endswith('.py')]
+def get_staged_python_files(staged: Optional[List[str]] = None) -> List[str]:
+    """Obtiene archivos Python staged (de la lista dada o consultando git)."""
+    if staged is None:
+        staged = get_staged_files()
+    return [f for f in staged if f.endswith('.py')]
 
 
-def get_staged_dependency_files() -> Set[str]:
+def get_staged_dependency_files(staged: Optional[List[str]] = None) -> Set[str]:
     """Obtiene archivos de dependencias que fueron modificados."""
-    staged = set(get_staged_files())
-    return staged & DEPENDENCY_FILES
+    if staged is None:
+        staged = get_staged_files()
+    return set(staged) & DEPENDENCY_FILES
 
 
 def run_lint_check(files: List[str]) -> Tuple[bool, str]:
@@ -104,21 +121,42 @@ def run_lint_check(files: List[str]) -> Tuple[bool, str]:
         return True, f"Error: {e}"
 
 
-def run_snyk_code_scan() -> Tuple[bool, str, int, int]:
+def count_snyk_code_issues(output: str) -> Tuple[int, int]:
+    """
+    Cuenta issues (critical, high) de la salida de `snyk code test --json`.
+    
+    Usa el reporte SARIF: nivel 'error' equivale a High (Snyk Code no tiene
+    severidad Critical). Si la salida no es SARIF, cuenta sobre el texto.
+    """
+    try:
+        runs = json.loads(output)["runs"]
+    except (ValueError, KeyError, TypeError):
+        lowered = output.lower()
+        return lowered.count("critical"), lowered.count("high severity") + lowered.count("[high]")
+    
+    high = sum(
+        1 for run in runs for issue in run.get("results", [])
+        if issue.get("level") == "error"
+    )
+    return 0, high
+
+
+def run_snyk_code_scan(messages: Optional[List] = None) -> Tuple[bool, str, int, int]:
     """
     GATE DE SNYK - Escanea codigo fuente.
     Bloquea si encuentra Critical/High.
     """
+    if not SNYK_BIN:
+        _log(messages, log_warn, "Snyk CLI no encontrado")
+        return True, "Snyk no disponible", 0, 0
+    
     try:
-        # Buscar Snyk CLI dinámicamente (portable)
-        import shutil
-        snyk_cmd = shutil.which("snyk") or shutil.which("snyk-win") or "snyk"
-        
         result = subprocess.run(
             [
-                snyk_cmd,
+                SNYK_BIN,
                 "code", "test",
                 "--severity-threshold=high",
+                "--json",
                 "."
             ],
             capture_output=True,
@@ -129,8 +167,7 @@ def run_snyk_code_scan() -> Tuple[bool, str, int, int]:
         )
         
         output = result.stdout + result.stderr
-        critical = output.lower().count("critical")
-        high = output.lower().count("high severity") + output.lower().count("[high]")
+        critical, high = count_snyk_code_issues(result.stdout)
         
         if result.returncode != 0 or critical > 0 or high > 0:
             return False, output, critical, high
@@ -138,16 +175,17 @@ def run_snyk_code_scan() -> Tuple[bool, str, int, int]:
         return True, output, 0, 0
         
     except FileNotFoundError:
-        log_warn("Snyk CLI no encontrado")
+        _log(messages, log_warn, "Snyk CLI no encontrado")
         return True, "Snyk no disponible", 0, 0
     except subprocess.TimeoutExpired:
-        log_warn("Snyk code scan timeout")
+        _log(messages, log_warn, "Snyk code scan timeout")
         return True, "Timeout", 0, 0
     except Exception as e:
         return True, str(e), 0, 0
 
 
-def run_snyk_dependency_scan(dep_files: Set[str]) -> Tuple[bool, str, List[str]]:
+def run_snyk_dependency_scan(dep_files: Set[str],
+                             messages: Optional[List] = None) -> Tuple[bool, str, List[str]]:
     """
     SNYK-DIFF POLICY - Escanea dependencias modificadas.
     Si un cambio en requirements.txt/package.json introduce vulnerabilidad, bloquea.
@@ -155,17 +193,21 @@ def run_snyk_dependency_scan(dep_files: Set[str]) -> Tuple[bool, str, List[str]]
     if not dep_files:
         return True, "Sin cambios en dependencias", []
     
+    if not SNYK_BIN:
+        _log(messages, log_warn, "Snyk CLI no encontrado, saltando scan de dependencias")
+        return True, "Snyk no disponible", []
+    
     vulnerabilities = []
     
     for dep_file in dep_files:
-        print(f"    Escaneando: {dep_file}")
+        _log(messages, print, f"    Escaneando: {dep_file}")
         
         try:
             # Determinar tipo de proyecto
             if dep_file in {'requirements.txt', 'requirements-dev.txt', 'Pipfile', 'pyproject.toml'}:
-                cmd = ["snyk", "test", "--severity-threshold=high", "--file=" + dep_file]
+                cmd = [SNYK_BIN, "test", "--severity-threshold=high", "--file=" + dep_file]
             elif dep_file in {'package.json', 'package-lock.json', 'yarn.lock'}:
-                cmd = ["snyk", "test", "--severity-threshold=high"]
+                cmd = [SNYK_BIN, "test", "--severity-threshold=high"]
             else:
                 continue
             
@@ -192,11 +234,11 @@ def run_snyk_dependency_scan(dep_files: Set[str]) -> Tuple[bool, str, List[str]]
         
         except FileNotFoundError:
             # Snyk CLI no disponible, usar alternativa
-            log_warn(f"Snyk test no disponible para {dep_file}")
+            _log(messages, log_warn, f"Snyk test no disponible para {dep_file}")
         except subprocess.TimeoutExpired:
-            log_warn(f"Timeout escaneando {dep_file}")
+            _log(messages, log_warn, f"Timeout escaneando {dep_file}")
         except Exception as e:
-            log_warn(f"Error escaneando {dep_file}: {e}")
+            _log(messages, log_warn, f"Error escaneando {dep_file}: {e}")
     
     if vulnerabilities:
         return False, "\n".join(vulnerabilities), vulnerabilities
@@ -211,59 +253,73 @@ def run_pre_commit(skip_snyk: bool = False, skip_deps: bool = False) -> bool:
     print(make_header("AGCCE Pre-Commit Hook v2.1"))
     
     all_passed = True
+    # Una sola consulta a git; los subconjuntos se derivan de ella
     staged_files = get_staged_files()
-    python_files = get_staged_python_files()
-    dep_files = get_staged_dependency_files()
+    python_files = get_staged_python_files(staged_files)
+    dep_files = get_staged_dependency_files(staged_files)
     
     print(f"{Colors.CYAN}Archivos staged:{Colors.RESET} {len(staged_files)}")
     print(f"{Colors.CYAN}Archivos Python:{Colors.RESET} {len(python_files)}")
     print(f"{Colors.CYAN}Archivos de dependencias:{Colors.RESET} {len(dep_files)}")
     print()
     
-    # 1. Lint Check
-    print(f"{Colors.BOLD}[1/4] Lint Check...{Colors.RESET}")
-    passed, output = run_lint_check(python_files)
-    if passed:
-        log_pass("Lint check pasado")
-    else:
-        log_fail("Lint check fallido")
-        print(output[:300])
-        all_passed = False
-    
-    # 2. Snyk Code Scan
-    print(f"\n{Colors.BOLD}[2/4] Snyk Code Security Scan...{Colors.RESET}")
-    
-    if skip_snyk:
-        log_warn("Snyk code scan saltado")
-    else:
-        passed, output, critical, high = run_snyk_code_scan()
+    # Los checks son independientes: corren en paralelo (las esperas de
+    # subprocess liberan el GIL) y sus resultados se muestran en orden
+    code_log, deps_log = [], []
+    scan_deps = dep_files and not skip_deps
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        lint_future = executor.submit(run_lint_check, python_files)
+        code_future = None if skip_snyk else executor.submit(run_snyk_code_scan, code_log)
+        deps_future = executor.submit(run_snyk_dependency_scan, dep_files, deps_log) if scan_deps else None
         
+        # 1. Lint Check
+        print(f"{Colors.BOLD}[1/4] Lint Check...{Colors.RESET}")
+        passed, output = lint_future.result()
         if passed:
-            log_pass("Sin vulnerabilidades Critical/High en codigo")
+            log_pass("Lint check pasado")
         else:
-            log_fail(f"Vulnerabilidades en codigo: {critical} Critical, {high} High")
+            log_fail("Lint check fallido")
+            print(output[:300])
             all_passed = False
-    
-    # 3. Snyk-Diff Policy (dependencias)
-    print(f"\n{Colors.BOLD}[3/4] Snyk-Diff Policy (dependencias)...{Colors.RESET}")
-    
-    if skip_deps or not dep_files:
-        if dep_files:
-            log_warn("Snyk-Diff saltado")
+        
+        # 2. Snyk Code Scan
+        print(f"\n{Colors.BOLD}[2/4] Snyk Code Security Scan...{Colors.RESET}")
+        
+        if skip_snyk:
+            log_warn("Snyk code scan saltado")
         else:
-            log_info("Sin cambios en archivos de dependencias")
-    else:
-        passed, output, vulns = run_snyk_dependency_scan(dep_files)
+            passed, output, critical, high = code_future.result()
+            for func, msg in code_log:
+                func(msg)
+            
+            if passed:
+                log_pass("Sin vulnerabilidades Critical/High en codigo")
+            else:
+                log_fail(f"Vulnerabilidades en codigo: {critical} Critical, {high} High")
+                all_passed = False
         
-        if passed:
-            log_pass("Sin vulnerabilidades nuevas en dependencias")
+        # 3. Snyk-Diff Policy (dependencias)
+        print(f"\n{Colors.BOLD}[3/4] Snyk-Diff Policy (dependencias)...{Colors.RESET}")
+        
+        if not scan_deps:
+            if dep_files:
+                log_warn("Snyk-Diff saltado")
+            else:
+                log_info("Sin cambios en archivos de dependencias")
         else:
-            log_fail(f"Vulnerabilidades en dependencias:")
-            for v in vulns[:5]:
-                print(f"    {Colors.RED}X{Colors.RESET} {v}")
-            if len(vulns) > 5:
-                print(f"    ... y {len(vulns) - 5} mas")
-            all_passed = False
+            passed, output, vulns = deps_future.result()
+            for func, msg in deps_log:
+                func(msg)
+            
+            if passed:
+                log_pass("Sin vulnerabilidades nuevas en dependencias")
+            else:
+                log_fail(f"Vulnerabilidades en dependencias:")
+                for v in vulns[:5]:
+                    print(f"    {Colors.RED}X{Colors.RESET} {v}")
+                if len(vulns) > 5:
+                    print(f"    ... y {len(vulns) - 5} mas")
+                all_passed = False
     
     # 4. Resumen
     print(f"\n{Colors.BOLD}[4/4] Resumen...{Colors.RESET}")
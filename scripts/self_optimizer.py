@@ -24,6 +24,13 @@ except ImportError:
     def log_warn(msg): print(f"[!] {msg}")
     def log_info(msg): print(f"[i] {msg}")
 
+# Lector de telemetria (incluye los logs rotados por mes)
+try:
+    from metrics_collector import TelemetryReader
+    HAS_READER = True
+except ImportError:
+    HAS_READER = False
+
 
 TELEMETRY_FILE = "logs/telemetry.jsonl"
 SECURITY_FILE = "logs/security_events.jsonl"
@@ -45,6 +52,10 @@ class SelfOptimizer:
         entries = []
         
         for filepath in [TELEMETRY_FILE, SECURITY_FILE]:
+            if HAS_READER:
+                entries.extend(TelemetryReader.read_entries(filepath, since=self.since))
+                continue
+            
             if not os.path.exists(filepath):
                 continue
             
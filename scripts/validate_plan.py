@@ -33,6 +33,16 @@ except ImportError:
     def make_header(title, width=60): return f"\n{'=' * width}\n  {title}\n{'=' * width}\n"
 
 
+# Reglas compiladas una sola vez (se reutilizan en cada validacion)
+PLAN_ID_RE = re.compile(r'^PLAN-[A-Z0-9]{8}$')
+STEP_ID_RE = re.compile(r'^S[0-9]{2}$')
+VALID_ACTIONS = frozenset({
+    'read_file', 'write_file', 'delete_file', 'run_command',
+    'docker_compose_up', 'docker_run_tests', 'docker_fetch_logs',
+    'lint_check', 'type_check', 'snyk_scan', 'git_commit'
+})
+
+
 def load_plan(path: str) -> Dict[str, Any]:
     """Carga el plan JSON desde archivo."""
     with open(path, 'r', encoding='utf-8') as f:
@@ -56,7 +66,7 @@ def validate_plan_id(plan: Dict) -> List[str]:
     errors = []
     plan_id = plan.get('plan_id', '')
     
-    if not re.match(r'^PLAN-[A-Z0-9]{8}$', plan_id):
+    if not PLAN_ID_RE.match(plan_id):
         errors.append(f"plan_id invalido: '{plan_id}'. Formato esperado: PLAN-XXXXXXXX")
     
     return errors
@@ -72,17 +82,12 @@ def validate_steps(plan: Dict) -> List[str]:
         return errors
     
     seen_ids = set()
-    valid_actions = [
-        'read_file', 'write_file', 'delete_file', 'run_command',
-        'docker_compose_up', 'docker_run_tests', 'docker_fetch_logs',
-        'lint_check', 'type_check', 'snyk_scan', 'git_commit'
-    ]
     
     for i, step in enumerate(steps):
         step_id = step.get('id', '')
         
         # Validar formato de ID
-        if not re.match(r'^S[0-9]{2}$', step_id):
+        if not STEP_ID_RE.match(step_id):
             errors.append(f"Paso {i+1}: ID invalido '{step_id}'. Formato: S01, S02, etc.")
         
         # Validar unicidad
@@ -93,7 +98,7 @@ def validate_steps(plan: Dict) -> List[str]:
         # Validar campos requeridos
         if 'action' not in step:
             errors.append(f"Paso {step_id}: falta 'action'")
-        elif step['action'] not in valid_actions:
+        elif step['action'] not in VALID_ACTIONS:
             errors.append(f"Paso {step_id}: accion invalida '{step['action']}'")
         
         if 'target' not in step:
@@ -163,18 +168,11 @@ def validate_docker_mapping(plan: Dict) -> List[str]:
     return errors
 
 
-def run_validation(plan_path: str) -> Tuple[bool, List[str], List[str]]:
-    """Ejecuta todas las validaciones."""
+def validate_plan_dict(plan: Dict) -> Tuple[bool, List[str], List[str]]:
+    """Ejecuta todas las validaciones sobre un plan ya parseado."""
     errors = []
     warnings = []
     
-    try:
-        plan = load_plan(plan_path)
-    except json.JSONDecodeError as e:
-        return False, [f"JSON invalido: {e}"], []
-    except FileNotFoundError:
-        return False, [f"Archivo no encontrado: {plan_path}"], []
-    
     # Validaciones
     errors.extend(validate_required_fields(plan))
     errors.extend(validate_plan_id(plan))
@@ -194,6 +192,18 @@ def run_validation(plan_path: str) -> Tuple[bool, List[str], List[str]]:
     return success, errors, warnings
 
 
+def run_validation(plan_path: str) -> Tuple[bool, List[str], List[str]]:
+    """Carga el plan desde archivo y ejecuta todas las validaciones."""
+    try:
+        plan = load_plan(plan_path)
+    except json.JSONDecodeError as e:
+        return False, [f"JSON invalido: {e}"], []
+    except FileNotFoundError:
+        return False, [f"Archivo no encontrado: {plan_path}"], []
+    
+    return validate_plan_dict(plan)
+
+
 def main():
     if len(sys.argv) < 2:
         print(f"Uso: python {sys.argv[0]} <plan.json>")
@@ -0,0 +1,48 @@
+"""
+Tests para gem_loader.py
+"""
+import json
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from gem_loader import GemLoader
+from gem_registry import GemRegistry
+
+
+class TestGemLoader:
+    """Tests de carga de Gems y cache de profiles."""
+    
+    @pytest.fixture
+    def gem_path(self, temp_dir, monkeypatch):
+        """Gem mínimo dentro de un proyecto temporal."""
+        monkeypatch.chdir(temp_dir)
+        gem = {
+            "bundle_meta": {"use_case_id": "demo", "version": "1.0.0", "risk_score": 10},
+            "system_prompt": {"text": "Eres un asistente."},
+            "model_routing": {"selected_model": "gemini-pro"},
+            "policies": {"security": {}}
+        }
+        path = temp_dir / "demo_gem.json"
+        path.write_text(json.dumps(gem), encoding='utf-8')
+        return path
+    
+    def test_profiles_cached_at_written_path(self, gem_path, temp_dir, capsys):
+        """Los profiles guardados se cachean con su path y se reutilizan."""
+        output_dir = temp_dir / "profiles"
+        loader = GemLoader(str(temp_dir / "missing_schema.json"))
+        
+        profiles = loader.create_agent_profiles_from_gem(str(gem_path), output_dir=str(output_dir))
+        
+        registry = GemRegistry()
+        assert registry.get_cached_profile("demo", "1.0.0", "tester") == str(output_dir / "demo_tester.json")
+        assert registry.get_gem("demo", "1.0.0") is not None
+        capsys.readouterr()
+        
+        cached = loader.create_agent_profiles_from_gem(str(gem_path))
+        
+        assert cached == profiles
+        assert capsys.readouterr().out.count("(from cache)") == 5
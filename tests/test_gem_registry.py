@@ -0,0 +1,130 @@
+"""
+Tests para gem_registry.py
+"""
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from gem_registry import GemRegistry
+
+
+class TestGemRegistry:
+    """Tests para GemRegistry."""
+    
+    @pytest.fixture
+    def registry(self, temp_dir):
+        """Registry temporal con un Gem registrado."""
+        gem_path = temp_dir / "demo_gem.json"
+        gem_path.write_text('{"bundle_meta": {}}', encoding='utf-8')
+        
+        registry = GemRegistry(str(temp_dir / "gem_registry.json"))
+        registry.register_gem(str(gem_path), {
+            "use_case_id": "demo",
+            "version": "1.0.0",
+            "model": "gemini-pro",
+            "risk_score": 10
+        })
+        yield registry
+        registry.close()
+    
+    def test_record_usage_defers_write(self, registry):
+        """Debe acumular usos en memoria sin reescribir el registry."""
+        registry_file = Path(registry.registry_path)
+        before = registry_file.read_bytes()
+        
+        registry.record_usage("demo", "1.0.0")
+        
+        assert registry_file.read_bytes() == before
+        assert registry.get_gem("demo")["usage_count"] == 1
+    
+    def test_flush_merges_concurrent_writers(self, registry):
+        """Usos de dos instancias deben sumarse, no sobrescribirse."""
+        other = GemRegistry(registry.registry_path)
+        
+        registry.record_usage("demo", "1.0.0")
+        other.record_usage("demo", "1.0.0")
+        other.record_usage("demo", "1.0.0")
+        registry.flush_usage()
+        other.flush_usage()
+        
+        assert GemRegistry(registry.registry_path).get_gem("demo")["usage_count"] == 3
+    
+    def test_stale_instance_write_keeps_merged_usage(self, registry, temp_dir):
+        """Registrar o cachear desde una instancia vieja no pisa usos ajenos."""
+        other = GemRegistry(registry.registry_path)
+        other.record_usage("demo", "1.0.0")
+        other.flush_usage()
+        
+        registry.cache_profile("demo", "1.0.0", "researcher", {}, profile_path=str(temp_dir / "p.json"))
+        gem_path = temp_dir / "other.json"
+        gem_path.write_text("{}", encoding='utf-8')
+        registry.register_gem(str(gem_path), {
+            "use_case_id": "other", "version": "1.0.0", "model": "m", "risk_score": 1
+        })
+        
+        reloaded = GemRegistry(registry.registry_path)
+        assert reloaded.get_gem("demo")["usage_count"] == 1
+        assert reloaded.get_gem("other") is not None
+        assert not list(temp_dir.glob("*.tmp"))
+    
+    def test_failed_flush_keeps_pending_usage(self, registry, monkeypatch):
+        """Si la escritura falla, los usos siguen pendientes para el siguiente flush."""
+        registry.record_usage("demo", "1.0.0")
+        original_save = registry._save_registry
+        
+        def failing_save():
+            raise OSError("disco lleno")
+        
+        monkeypatch.setattr(registry, "_save_registry", failing_save)
+        with pytest.raises(OSError):
+            registry.flush_usage()
+        
+        assert registry._pending_usage[("demo", "1.0.0")] == 1
+        
+        monkeypatch.setattr(registry, "_save_registry", original_save)
+        registry.flush_usage()
+        
+        assert not registry._pending_usage and not registry._last_used
+        assert GemRegistry(registry.registry_path).get_gem("demo")["usage_count"] == 1
+    
+    def test_close_flushes_usage(self, registry):
+        """close() debe volcar los usos al registry."""
+        registry.record_usage("demo", "1.0.0")
+        registry.close()
+        
+        assert GemRegistry(registry.registry_path).get_gem("demo")["usage_count"] == 1
+    
+    def test_record_usage_unknown_gem_ignored(self, registry):
+        """Gems no registrados no deben acumular usos."""
+        registry.record_usage("missing", "1.0.0")
+        
+        assert not registry._pending_usage
+    
+    def test_get_cached_profile_uses_recorded_path(self, registry, temp_dir):
+        """Debe retornar el path registrado en cache_profile."""
+        profile_path = temp_dir / "demo_researcher.json"
+        profile_path.write_text("{}", encoding='utf-8')
+        
+        registry.cache_profile("demo", "1.0.0", "researcher", {}, profile_path=str(profile_path))
+        
+        assert registry.get_cached_profile("demo", "1.0.0", "researcher") == str(profile_path)
+        assert registry.get_cached_profile("demo", "1.0.0", "tester") is None
+    
+    def test_list_gems_semver_order(self, registry, temp_dir):
+        """Debe ordenar versiones numéricamente (1.9.0 < 1.10.0)."""
+        gem_path = temp_dir / "demo_gem.json"
+        for version in ("1.10.0", "1.9.0"):
+            registry.register_gem(str(gem_path), {
+                "use_case_id": "demo",
+                "version": version,
+                "model": "gemini-pro",
+                "risk_score": 10
+            })
+        
+        versions = [g["version"] for g in registry.list_gems()]
+        
+        assert versions == ["1.0.0", "1.9.0", "1.10.0"]
+        assert registry.get_gem("demo")["version"] == "1.10.0"
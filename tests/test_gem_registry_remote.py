@@ -0,0 +1,170 @@
+"""
+Tests para gem_registry_remote.py
+"""
+import json
+import shutil
+import subprocess
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import gem_registry_remote
+from gem_registry_remote import GemRegistryRemote
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git no disponible")
+
+
+def _git(*args, cwd):
+    subprocess.run(["git", *args], cwd=str(cwd), check=True, capture_output=True)
+
+
+def _write_gem(directory: Path, name: str, version: str):
+    (directory / f"{name}.json").write_text(
+        json.dumps({"bundle_meta": {"version": version, "use_case_id": name}}), encoding='utf-8'
+    )
+
+
+class TestGemRegistryRemote:
+    """Tests de push/pull contra un repositorio bare local."""
+    
+    @pytest.fixture(autouse=True)
+    def git_identity(self, monkeypatch):
+        """Identidad fija para los commits de sincronización."""
+        for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+            monkeypatch.setenv(f"{var}_NAME", "test")
+            monkeypatch.setenv(f"{var}_EMAIL", "test@example.com")
+    
+    def _make_bare(self, root: Path, name: str) -> Path:
+        """Crea un repo bare con un branch main que contiene gems/."""
+        bare = root / f"{name}.git"
+        seed = root / f"{name}-seed"
+        _git("init", "--bare", "-b", "main", str(bare), cwd=root)
+        _git("init", "-b", "main", str(seed), cwd=root)
+        (seed / "gems").mkdir()
+        (seed / "gems" / ".gitkeep").write_text("", encoding='utf-8')
+        _git("add", ".", cwd=seed)
+        _git("commit", "-m", "init", cwd=seed)
+        _git("push", str(bare), "main", cwd=seed)
+        return bare
+    
+    @pytest.fixture
+    def remote(self, temp_dir):
+        """Registry local con un gem y un remote 'origin' vacío."""
+        local = temp_dir / "local"
+        local.mkdir()
+        _write_gem(local, "alpha", "1.0.0")
+        
+        registry = GemRegistryRemote(gems_dir=str(local))
+        registry.add_remote("origin", str(self._make_bare(temp_dir, "origin")))
+        return registry
+    
+    def _remote_files(self, bare: Path):
+        listing = subprocess.run(
+            ["git", "ls-tree", "--name-only", "main", "gems/"],
+            cwd=str(bare), capture_output=True, text=True, check=True
+        ).stdout
+        return sorted(Path(line).name for line in listing.splitlines())
+    
+    def test_push_then_up_to_date(self, remote):
+        """El primer push envía los gems; el segundo no tiene nada que enviar."""
+        bare = Path(remote.remotes["origin"].url)
+        
+        result = remote.push("origin")
+        
+        assert result.success and result.action == "pushed"
+        assert result.gems_synced == ["alpha"]
+        assert self._remote_files(bare) == [".gitkeep", "alpha.json"]
+        
+        again = remote.push("origin")
+        assert again.success and again.action == "up-to-date"
+    
+    def test_push_skips_existing_blobs(self, remote):
+        """Solo se envían los gems cuyo blob no existe ya en el remote."""
+        remote.push("origin")
+        _write_gem(remote.gems_dir, "beta", "1.0.0")
+        
+        result = remote.push("origin")
+        
+        assert result.gems_synced == ["beta"]
+    
+    def test_worktree_removed_after_push(self, remote):
+        """El worktree temporal se elimina; el mirror se conserva."""
+        remote.push("origin")
+        
+        mirror = remote._mirror_path(remote.remotes["origin"])
+        assert not (remote.gems_dir / ".temp_sync" / "origin").exists()
+        assert mirror.is_dir()
+        worktrees = subprocess.run(
+            ["git", "worktree", "list", "--porcelain"],
+            cwd=str(mirror), capture_output=True, text=True, check=True
+        ).stdout
+        assert "temp_sync" not in worktrees
+    
+    def test_pull_new_gems_and_version_conflict(self, remote, temp_dir):
+        """Un gem nuevo se copia; uno distinto sin versión remota mayor es conflicto."""
+        remote.push("origin")
+        other = GemRegistryRemote(gems_dir=str(temp_dir / "other"))
+        other.add_remote("origin", remote.remotes["origin"].url)
+        _write_gem(other.gems_dir, "alpha", "1.5.0")
+        _write_gem(other.gems_dir, "beta", "1.0.0")
+        other.push("origin", ["beta"])
+        
+        result = remote.pull("origin")
+        
+        assert result.success and result.action == "pulled"
+        assert result.gems_synced == ["beta"]
+        assert (remote.gems_dir / "beta.json").exists()
+        
+        conflict = other.pull("origin", ["alpha"])
+        assert conflict.conflicts == ["alpha"]
+        assert json.loads((other.gems_dir / "alpha.json").read_text())["bundle_meta"]["version"] == "1.5.0"
+    
+    def test_pull_newer_remote_version_overwrites(self, remote, temp_dir):
+        """Si la versión remota es mayor, el gem local se actualiza."""
+        remote.push("origin")
+        _write_gem(remote.gems_dir, "alpha", "2.0.0")
+        remote.push("origin")
+        other = GemRegistryRemote(gems_dir=str(temp_dir / "other"))
+        other.add_remote("origin", remote.remotes["origin"].url)
+        _write_gem(other.gems_dir, "alpha", "1.0.0")
+        
+        result = other.pull("origin")
+        
+        assert result.gems_synced == ["alpha"] and result.conflicts == []
+        assert json.loads((other.gems_dir / "alpha.json").read_text())["bundle_meta"]["version"] == "2.0.0"
+    
+    def test_push_all_and_pull_all_keyed_by_remote(self, remote, temp_dir):
+        """Los resultados de push_all/pull_all se indexan por remote."""
+        remote.add_remote("backup", str(self._make_bare(temp_dir, "backup")))
+        
+        pushed = remote.push_all(remote_names=["origin", "backup", "missing"])
+        
+        assert list(pushed) == ["origin", "backup", "missing"]
+        assert pushed["origin"].action == pushed["backup"].action == "pushed"
+        assert pushed["missing"].action == "error"
+        assert not (remote.gems_dir / ".temp_sync" / "backup").exists()
+        
+        (remote.gems_dir / "alpha.json").unlink()
+        pulled = remote.pull_all()
+        
+        assert set(pulled) == {"origin", "backup"}
+        assert sorted(r.gems_synced != [] for r in pulled.values()) == [False, True]
+        assert (remote.gems_dir / "alpha.json").exists()
+    
+    def test_git_chain_stops_at_first_failure(self, remote, temp_dir, monkeypatch):
+        """La cadena se corta en el primer fallo, con y sin shell."""
+        _git("init", str(temp_dir / "repo"), cwd=temp_dir)
+        chain = [["status"], ["no-such-command"], ["commit", "--allow-empty", "-m", "x"]]
+        
+        for os_name in ("posix", "nt"):
+            monkeypatch.setattr(gem_registry_remote.os, "name", os_name)
+            success, output = remote._run_git_chain(chain, cwd=str(temp_dir / "repo"))
+            
+            assert not success
+            assert "no-such-command" in output
+        
+        assert subprocess.run(["git", "rev-parse", "HEAD"], cwd=str(temp_dir / "repo"),
+                              capture_output=True).returncode != 0
@@ -0,0 +1,60 @@
+"""
+Tests para graceful_recovery.py
+"""
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import graceful_recovery
+from graceful_recovery import GracefulRecovery
+
+
+class TestGracefulRecovery:
+    """Tests para GracefulRecovery."""
+    
+    @pytest.fixture(autouse=True)
+    def isolated_logs(self, temp_dir, monkeypatch):
+        """Redirige los logs de recuperación a un directorio temporal."""
+        GracefulRecovery._close_log()
+        monkeypatch.setattr(graceful_recovery, "LOGS_DIR", temp_dir)
+        monkeypatch.setattr(graceful_recovery, "RECOVERY_LOG", temp_dir / "recovery_events.jsonl")
+        monkeypatch.setattr(graceful_recovery, "RECOVERY_STATS_CACHE", temp_dir / ".recovery_stats.json")
+        yield
+        GracefulRecovery._close_log()
+    
+    def test_validate_missing_fields(self):
+        """Debe reportar campos requeridos ausentes."""
+        is_valid, error = GracefulRecovery.validate_agent_response({"plan": []}, "architect")
+        
+        assert not is_valid
+        assert "steps" in error
+    
+    def test_validate_malformed_json(self):
+        """Strings que no son JSON deben fallar la validación."""
+        is_valid, error = GracefulRecovery.validate_agent_response("{bad", "tester")
+        
+        assert not is_valid
+        assert error.startswith("Malformed JSON")
+    
+    def test_should_escalate_is_case_insensitive(self):
+        """Errores críticos escalan sin importar mayúsculas."""
+        assert GracefulRecovery.should_escalate_to_user("auditor", "API Key expired")
+        assert not GracefulRecovery.should_escalate_to_user("auditor", "timeout")
+    
+    def test_recovery_stats_incremental(self):
+        """Las stats deben incluir eventos añadidos tras una llamada previa."""
+        GracefulRecovery.execute_with_recovery("tester", lambda: {"tests_passed": 1, "results": []})
+        first = GracefulRecovery.get_recovery_stats()
+        
+        responses = iter([None, {"tests_passed": 1, "results": []}])
+        GracefulRecovery.execute_with_recovery("tester", lambda: next(responses))
+        second = GracefulRecovery.get_recovery_stats()
+        
+        assert first["total_events"] == 1
+        assert second["total_events"] == 3
+        assert second["success"] == 2
+        assert second["retries"] == 1
+        assert second["by_agent"]["tester"] == {"success": 2, "retry": 1, "failed": 0}
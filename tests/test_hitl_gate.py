@@ -0,0 +1,114 @@
+"""
+Tests para hitl_gate.py
+"""
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import hitl_gate
+
+
+class TestHitlGate:
+    """Tests para el registro y verificación de aprobaciones."""
+    
+    @pytest.fixture(autouse=True)
+    def isolated_approvals(self, temp_dir, monkeypatch):
+        """Redirige el archivo de aprobaciones a un directorio temporal."""
+        monkeypatch.setattr(hitl_gate, "APPROVAL_FILE", str(temp_dir / ".hitl_approvals.jsonl"))
+        monkeypatch.setattr(hitl_gate, "LEGACY_APPROVAL_FILE", str(temp_dir / ".hitl_approvals.json"))
+    
+    def test_approve_step_stores_expiry_epoch(self):
+        """La aprobación debe guardar su expiración como epoch entero."""
+        hitl_gate.approve_step("PLAN-1", "S1")
+        
+        approval = hitl_gate.load_approvals()["approvals"]["PLAN-1"]["S1"]
+        
+        assert isinstance(approval["expires_at_epoch"], int)
+        assert hitl_gate.check_step_approval("PLAN-1", "S1", hitl_gate.load_approvals())
+    
+    def test_expired_approval_is_rejected(self):
+        """Una aprobación vencida no debe contar como válida."""
+        approvals = {"approvals": {"PLAN-1": {"S1": {
+            "approved": True,
+            "approved_at": "2020-01-01T00:00:00",
+            "expires_at_epoch": 0
+        }}}}
+        
+        assert not hitl_gate.check_step_approval("PLAN-1", "S1", approvals)
+    
+    def test_legacy_approval_without_epoch(self):
+        """Aprobaciones antiguas (solo approved_at) siguen verificándose."""
+        approvals = {"approvals": {"PLAN-1": {
+            "OLD": {"approved": True, "approved_at": "2020-01-01T00:00:00"},
+            "BAD": {"approved": True, "approved_at": "no-es-fecha"}
+        }}}
+        
+        assert not hitl_gate.check_step_approval("PLAN-1", "OLD", approvals)
+        assert not hitl_gate.check_step_approval("PLAN-1", "BAD", approvals)
+    
+    def test_interactive_approval_saves_once(self, temp_dir, monkeypatch):
+        """La sesión interactiva anexa sus decisiones en una sola escritura."""
+        plan_path = temp_dir / "plan.json"
+        plan_path.write_text(
+            '{"plan_id": "PLAN-2", "steps": ['
+            '{"id": "S1", "action": "write_file"}, {"id": "S2", "action": "git_commit"}]}',
+            encoding='utf-8'
+        )
+        monkeypatch.setattr("builtins.input", lambda prompt="": "s")
+        
+        saves = []
+        original_append = hitl_gate.append_approvals
+        monkeypatch.setattr(hitl_gate, "append_approvals", lambda r: (saves.append(1), original_append(r)))
+        
+        assert hitl_gate.interactive_approval(str(plan_path))
+        
+        assert len(saves) == 1
+        assert set(hitl_gate.load_approvals()["approvals"]["PLAN-2"]) == {"S1", "S2"}
+    
+    def test_check_all_hitl_lists_every_step(self, temp_dir, capsys):
+        """El resumen debe listar cada paso con su estado."""
+        plan_path = temp_dir / "plan.json"
+        plan_path.write_text(
+            '{"plan_id": "PLAN-3", "steps": ['
+            '{"id": "S1", "action": "write_file", "target": "a.py"},'
+            '{"id": "S2", "action": "read_file", "target": "b.py"},'
+            '{"id": "S3", "action": "git_commit", "target": "repo"}]}',
+            encoding='utf-8'
+        )
+        hitl_gate.approve_step("PLAN-3", "S1")
+        capsys.readouterr()
+        
+        assert not hitl_gate.check_all_hitl(str(plan_path))
+        
+        out = capsys.readouterr().out
+        assert f"{hitl_gate.STATUS_APPROVED} S1: write_file -> a.py\n" in out
+        assert f"{hitl_gate.STATUS_PENDING} S3: git_commit -> repo\n" in out
+        assert "S2" not in out
+    
+    def test_journal_replays_over_legacy_file(self, temp_dir):
+        """El journal se aplica sobre el archivo anterior; gana la última decisión."""
+        (temp_dir / ".hitl_approvals.json").write_text(
+            '{"approvals": {"PLAN-4": {"S1": {"approved": false, "reason": "old"}, '
+            '"S2": {"approved": false, "reason": "kept"}}}}',
+            encoding='utf-8'
+        )
+        hitl_gate.reject_step("PLAN-4", "S1", "first")
+        hitl_gate.approve_step("PLAN-4", "S1")
+        
+        plan_approvals = hitl_gate.load_approvals()["approvals"]["PLAN-4"]
+        
+        assert plan_approvals["S1"]["approved"] is True
+        assert plan_approvals["S2"]["reason"] == "kept"
+        with open(hitl_gate.APPROVAL_FILE, 'rb') as f:
+            assert len(f.readlines()) == 2
+    
+    def test_malformed_journal_records_are_skipped(self):
+        """Registros JSON validos pero incompletos no abortan la carga."""
+        hitl_gate.approve_step("PLAN-5", "S1")
+        with open(hitl_gate.APPROVAL_FILE, 'ab') as f:
+            f.write(b'{}\n{"plan_id": "PLAN-5"}\n[1, 2]\n{"plan_id": ["x"], "step_id": "S2"}\n{"plan_id": "PLAN-5", "st')
+        
+        assert set(hitl_gate.load_approvals()["approvals"]["PLAN-5"]) == {"S1"}
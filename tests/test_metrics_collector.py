@@ -0,0 +1,249 @@
+"""
+Tests para metrics_collector.py
+"""
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from queue import Queue
+import sys
+import threading
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import metrics_collector
+
+
+class TestBranchName:
+    """Tests para la detección (cacheada) del branch."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_cache(self, monkeypatch):
+        """Invalida el cache del branch entre tests."""
+        monkeypatch.setattr(metrics_collector, "_branch_cache", None)
+    
+    def test_reads_branch_from_git_head(self, temp_dir, monkeypatch):
+        """Debe leer el branch de .git/HEAD sin lanzar git."""
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".git" / "HEAD").write_text("ref: refs/heads/feature/x\n", encoding='utf-8')
+        (temp_dir / "sub").mkdir()
+        monkeypatch.chdir(temp_dir / "sub")
+        monkeypatch.setattr(metrics_collector, "_get_branch_name_from_git", lambda: pytest.fail("git lanzado"))
+        
+        assert metrics_collector._get_branch_name() == "feature/x"
+    
+    def test_detached_head_is_empty(self, temp_dir, monkeypatch):
+        """Con HEAD detached el branch es vacío (como git branch --show-current)."""
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".git" / "HEAD").write_text("0123456789abcdef\n", encoding='utf-8')
+        monkeypatch.chdir(temp_dir)
+        
+        assert metrics_collector._read_branch_from_head() == ""
+    
+    def test_branch_is_cached(self, monkeypatch):
+        """Llamadas dentro del TTL reutilizan el valor cacheado."""
+        calls = []
+        monkeypatch.setattr(metrics_collector, "_read_branch_from_head", lambda: calls.append(1) or "main")
+        
+        assert metrics_collector._get_branch_name() == "main"
+        assert metrics_collector._get_branch_name() == "main"
+        assert len(calls) == 1
+
+
+class TestTelemetryQueue:
+    """Tests para la cola acotada de telemetría."""
+    
+    def test_full_queue_drops_newest(self, monkeypatch):
+        """Con la cola llena la entrada nueva se descarta sin bloquear."""
+        queue = Queue(maxsize=2)
+        monkeypatch.setattr(metrics_collector, "_telemetry_queue", queue)
+        monkeypatch.setattr(metrics_collector, "_worker_started", True)
+        monkeypatch.setattr(metrics_collector, "_dropped_count", 0)
+        
+        for i in range(5):
+            metrics_collector.Telemetry.record_async({"n": i})
+        
+        assert [queue.get_nowait()["n"] for _ in range(2)] == [0, 1]
+        assert metrics_collector.Telemetry.get_dropped_count() == 3
+        assert metrics_collector._take_dropped_count() == 3
+        assert metrics_collector.Telemetry.get_dropped_count() == 0
+    
+    def test_shutdown_drains_pending_entries(self, temp_dir, monkeypatch):
+        """Al salir, las entradas encoladas se escriben antes de parar el worker."""
+        log_file = temp_dir / "telemetry.jsonl"
+        monkeypatch.setattr(metrics_collector, "TELEMETRY_FILE", str(log_file))
+        monkeypatch.setattr(metrics_collector, "_telemetry_queue", Queue(maxsize=100))
+        monkeypatch.setattr(metrics_collector, "_worker_started", False)
+        monkeypatch.setattr(metrics_collector, "_worker_thread", None)
+        monkeypatch.setattr(metrics_collector, "_dropped_count", 0)
+        
+        for i in range(20):
+            metrics_collector.Telemetry.record_async({"n": i})
+        metrics_collector._drain_and_shutdown()
+        
+        assert not metrics_collector._worker_thread.is_alive()
+        lines = log_file.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)["n"] for line in lines] == list(range(20))
+    
+    def test_append_to_log_never_interleaves_lines(self, temp_dir):
+        """Escrituras concurrentes con O_APPEND no mezclan lineas."""
+        log_file = str(temp_dir / "telemetry.jsonl")
+        
+        def writer(n):
+            for i in range(100):
+                metrics_collector._append_to_log(log_file, {"writer": n, "i": i, "pad": "x" * 2000})
+        
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        with open(log_file, 'rb') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 400
+        assert all(json.loads(line)["pad"] == "x" * 2000 for line in lines)
+    
+    def test_base_entry_timestamp_formatted_by_worker(self, monkeypatch):
+        """El productor estampa ns; el worker lo convierte a ISO-8601."""
+        monkeypatch.setattr(metrics_collector, "_current_project", None)
+        monkeypatch.setattr(metrics_collector, "_dimensions_cache", None)
+        
+        entry = metrics_collector.Telemetry._create_base_entry("test.metric")
+        stamped = entry["timestamp"]
+        metrics_collector._format_timestamps([entry])
+        
+        assert isinstance(stamped, int)
+        assert datetime.fromisoformat(entry["timestamp"]).timestamp() == pytest.approx(stamped / 1e9, abs=1e-5)
+        assert entry["dimensions"]["project_id"] == Path.cwd().name
+        assert entry["dimensions"]["hostname"] == metrics_collector._BASE_DIMENSIONS["hostname"]
+    
+    @pytest.mark.parametrize("has_orjson", [True, False])
+    def test_dumps_line_is_utf8_jsonl(self, monkeypatch, has_orjson):
+        """La linea serializada es JSON UTF-8 con salto final, con o sin orjson."""
+        import common
+        if has_orjson and not common.HAS_ORJSON:
+            pytest.skip("orjson no instalado")
+        monkeypatch.setattr(common, "HAS_ORJSON", has_orjson)
+        
+        line = metrics_collector._dumps_line({"timestamp": "2026-01-01T00:00:00", "query": "añadir"})
+        
+        assert line.endswith(b"\n")
+        assert "añadir".encode('utf-8') in line
+        assert metrics_collector._raw_timestamp(line.decode('utf-8')) == "2026-01-01T00:00:00"
+    
+    def test_set_agent_invalidates_cached_dimensions(self, monkeypatch):
+        """Las dimensiones se reutilizan hasta que cambia el agente."""
+        monkeypatch.setattr(metrics_collector, "_current_agent", None)
+        monkeypatch.setattr(metrics_collector, "_dimensions_cache", None)
+        
+        first = metrics_collector.Telemetry._create_base_entry("a")
+        first["dimensions"]["model_id"] = "mutado"
+        second = metrics_collector.Telemetry._create_base_entry("b")
+        metrics_collector.Telemetry.set_agent("coder")
+        third = metrics_collector.Telemetry._create_base_entry("c")
+        
+        assert second["dimensions"]["model_id"] == "gemini-2.5-pro"
+        assert second["dimensions"]["agent_id"] == "orchestrator"
+        assert third["dimensions"]["agent_id"] == "coder"
+
+
+class TestTelemetryReader:
+    """Tests para la lectura filtrada del log."""
+    
+    def test_read_entries_filters_by_since(self, temp_dir):
+        """Solo deben volver entradas posteriores a since."""
+        now = datetime.now()
+        log_file = temp_dir / "telemetry.jsonl"
+        with open(log_file, 'w', encoding='utf-8') as f:
+            for days, entry_type in [(40, "old"), (3, "recent"), (0, "today")]:
+                entry = {"type": entry_type, "timestamp": (now - timedelta(days=days)).isoformat()}
+                f.write(json.dumps(entry) + "\n")
+            f.write("no-es-json\n")
+        
+        entries = metrics_collector.TelemetryReader.read_entries(
+            filepath=str(log_file), since=now - timedelta(days=7)
+        )
+        
+        assert [e["type"] for e in entries] == ["recent", "today"]
+    
+    def test_read_entries_seeks_to_window_with_slack(self, temp_dir):
+        """La busqueda binaria salta lo antiguo pero respeta el desorden leve."""
+        now = datetime.now()
+        log_file = temp_dir / "telemetry.jsonl"
+        since = now - timedelta(days=1)
+        with open(log_file, 'w', encoding='utf-8') as f:
+            for minutes in range(3000, 0, -1):
+                ts = now - timedelta(minutes=minutes)
+                f.write(json.dumps({"type": "tick", "timestamp": ts.isoformat()}) + "\n")
+                if minutes == 1441:
+                    # Llega tarde pero es posterior a since
+                    f.write(json.dumps({"type": "late", "timestamp": (since + timedelta(seconds=30)).isoformat()}) + "\n")
+        
+        entries = metrics_collector.TelemetryReader.read_entries(filepath=str(log_file), since=since)
+        
+        assert len(entries) == 1441
+        assert "late" in {e["type"] for e in entries}
+        assert all(e["timestamp"] >= since.isoformat() for e in entries)
+        assert metrics_collector._read_lines(str(temp_dir / "telemetry.jsonl"), now + timedelta(days=1)) == [""]
+    
+    def test_read_entries_includes_rotated_months(self, temp_dir):
+        """Los meses rotados dentro de la ventana se leen antes que el activo."""
+        now = datetime.now()
+        log_file = temp_dir / "telemetry.jsonl"
+        (temp_dir / "telemetry-2000-01.jsonl").write_text(
+            json.dumps({"type": "ancient", "timestamp": "2000-01-05T00:00:00"}) + "\n", encoding='utf-8'
+        )
+        (temp_dir / f"telemetry-{now:%Y-%m}.jsonl").write_text(
+            json.dumps({"type": "archived", "timestamp": now.isoformat()}) + "\n", encoding='utf-8'
+        )
+        log_file.write_text(json.dumps({"type": "active", "timestamp": now.isoformat()}) + "\n", encoding='utf-8')
+        
+        entries = metrics_collector.TelemetryReader.read_entries(
+            filepath=str(log_file), since=now - timedelta(days=1)
+        )
+        
+        assert [e["type"] for e in entries] == ["archived", "active"]
+    
+    def test_self_optimizer_reads_rotated_months(self, temp_dir, monkeypatch):
+        """El analizador tambien ve las entradas ya rotadas del log."""
+        import self_optimizer
+        now = datetime.now()
+        log_file = temp_dir / "telemetry.jsonl"
+        (temp_dir / f"telemetry-{now:%Y-%m}.jsonl").write_text(
+            json.dumps({"type": "archived", "timestamp": now.isoformat()}) + "\n", encoding='utf-8'
+        )
+        log_file.write_text(json.dumps({"type": "active", "timestamp": now.isoformat()}) + "\n", encoding='utf-8')
+        monkeypatch.setattr(self_optimizer, "TELEMETRY_FILE", str(log_file))
+        monkeypatch.setattr(self_optimizer, "SECURITY_FILE", str(temp_dir / "missing.jsonl"))
+        
+        entries = self_optimizer.SelfOptimizer(days=1).load_telemetry()
+        
+        assert [e["type"] for e in entries] == ["archived", "active"]
+    
+    def test_stale_log_is_rotated_by_month(self, temp_dir):
+        """Un log escrito por ultima vez en un mes anterior se renombra al reabrir."""
+        log_file = temp_dir / "telemetry.jsonl"
+        log_file.write_text('{"type": "old"}\n', encoding='utf-8')
+        old_mtime = datetime(2000, 1, 15).timestamp()
+        os.utime(log_file, (old_mtime, old_mtime))
+        
+        os.close(metrics_collector._current_log(None, str(log_file)))
+        
+        assert (temp_dir / "telemetry-2000-01.jsonl").read_text(encoding='utf-8') == '{"type": "old"}\n'
+        assert log_file.read_text(encoding='utf-8') == ""
+    
+    def test_cleanup_old_logs_unlinks_expired_months(self, temp_dir, monkeypatch):
+        """La limpieza borra solo los meses rotados fuera de retencion."""
+        now = datetime.now()
+        log_file = temp_dir / "telemetry.jsonl"
+        log_file.write_text("{}\n", encoding='utf-8')
+        (temp_dir / "telemetry-2000-01.jsonl").write_text("{}\n", encoding='utf-8')
+        (temp_dir / f"telemetry-{now:%Y-%m}.jsonl").write_text("{}\n", encoding='utf-8')
+        monkeypatch.setattr(metrics_collector, "TELEMETRY_FILE", str(log_file))
+        monkeypatch.setattr(metrics_collector, "SECURITY_LOG_FILE", str(temp_dir / "missing.jsonl"))
+        
+        assert metrics_collector.cleanup_old_logs(days=30) == 1
+        assert sorted(p.name for p in temp_dir.iterdir()) == [f"telemetry-{now:%Y-%m}.jsonl", "telemetry.jsonl"]
@@ -0,0 +1,138 @@
+"""
+Tests para plan_generator.py
+"""
+import pytest
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import plan_generator
+
+
+class TestPlanGenerator:
+    """Tests para la verificación semántica y la corrección de planes."""
+    
+    @pytest.fixture(autouse=True)
+    def isolated_project(self, temp_dir, monkeypatch):
+        """Ejecuta cada test dentro de un proyecto temporal."""
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "app.py").write_text("x = 1\n", encoding='utf-8')
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setattr(plan_generator, "_EXISTING_FILES_CACHE", {})
+    
+    def _plan(self, *paths):
+        return {
+            "plan_id": "PLAN-ABCD1234",
+            "objective": {"affected_files": list(paths)},
+            "steps": [
+                {"id": f"S{i:02d}", "action": "read_file", "target": p}
+                for i, p in enumerate(paths, 1)
+            ],
+            "evidence": {"analyzed_paths": list(paths)}
+        }
+    
+    def test_existing_files_walked_once(self, monkeypatch):
+        """El listado se memoiza hasta que se pide refrescarlo."""
+        walks = []
+        original = plan_generator.get_existing_files
+        monkeypatch.setattr(plan_generator, "get_existing_files", lambda: (walks.append(1), original())[1])
+        
+        plan = self._plan("src/app.py", "src/missing.py")
+        plan_generator.validate_semantic_existence(plan)
+        plan_generator.fix_plan(plan, ["hallucination"], ["src/missing.py"])
+        assert len(walks) == 1
+        
+        plan_generator._get_existing_files_cached(refresh=True)
+        assert len(walks) == 2
+    
+    def test_injected_existing_files(self):
+        """Un set inyectado evita recorrer el proyecto."""
+        passed, hallucinated = plan_generator.validate_semantic_existence(
+            self._plan("src/app.py", "src/missing.py"), frozenset({"src/app.py"})
+        )
+        
+        assert not passed
+        assert hallucinated == [
+            "affected_files: src/missing.py",
+            "step S02: src/missing.py",
+            "evidence: src/missing.py"
+        ]
+    
+    def test_skipped_dirs_not_listed(self, temp_dir):
+        """Ni los directorios excluidos ni los ocultos se recorren."""
+        for name in ("build", ".cache", "plans"):
+            (temp_dir / name).mkdir()
+            (temp_dir / name / "x.py").write_text("", encoding='utf-8')
+        
+        assert plan_generator.get_existing_files() == {"src/app.py"}
+    
+    def test_known_paths_without_stat(self, temp_dir, monkeypatch):
+        """Solo los paths que fallan en el set consultan el filesystem."""
+        (temp_dir / ".github").mkdir()
+        (temp_dir / ".github" / "ci.yml").write_text("", encoding='utf-8')
+        stats = []
+        original_exists = plan_generator.os.path.exists
+        monkeypatch.setattr(plan_generator.os.path, "exists", lambda p: (stats.append(p), original_exists(p))[1])
+        
+        passed, hallucinated = plan_generator.validate_semantic_existence(
+            self._plan("src", "./src/app.py", "src/missing.py", ".github/ci.yml")
+        )
+        
+        assert hallucinated == ["affected_files: src/missing.py", "step S03: src/missing.py", "evidence: src/missing.py"]
+        assert {".github/ci.yml", "src/missing.py"} <= set(stats)
+        assert "src" not in stats and "./src/app.py" not in stats
+    
+    def test_paths_missing_from_walk_not_hallucinated(self, temp_dir):
+        """Directorios vacios, ../ y archivos creados tras el recorrido existen."""
+        (temp_dir / "empty").mkdir()
+        sibling = temp_dir.parent / f"{temp_dir.name}-sibling.py"
+        sibling.write_text("", encoding='utf-8')
+        plan_generator._get_existing_files_cached()
+        (temp_dir / "src" / "new.py").write_text("", encoding='utf-8')
+        paths = ("empty", f"../{sibling.name}", "src/new.py")
+        
+        try:
+            passed, hallucinated = plan_generator.validate_semantic_existence(self._plan(*paths))
+            fixed = plan_generator.fix_plan(self._plan(*paths), ["hallucination"], [])
+        finally:
+            sibling.unlink()
+        
+        assert passed and hallucinated == []
+        assert fixed["objective"]["affected_files"] == list(paths)
+    
+    def test_symlinked_dirs_not_followed(self, temp_dir):
+        """Un symlink a un directorio no se recorre ni se lista (sin ciclos)."""
+        try:
+            (temp_dir / "src" / "loop").symlink_to(temp_dir, target_is_directory=True)
+        except OSError:
+            pytest.skip("symlinks no disponibles")
+        
+        assert plan_generator.get_existing_files() == {"src/app.py"}
+    
+    def test_analyze_validation_errors(self):
+        """Los patrones precompilados mantienen el mapeo de errores."""
+        output = "ERROR: Plan_ID invalido\nStep 2: falta 'target'\nTraceback (most recent call last):"
+        
+        errors = plan_generator.analyze_validation_errors(output)
+        
+        assert errors[:3] == ["plan_id", "missing_target", "traceback_error"]
+        assert errors[3].startswith("traceback_context:")
+    
+    def test_self_correction_validates_in_memory(self, temp_dir, capsys):
+        """El loop valida el plan en memoria, sin archivos temporales."""
+        success, path, plan = plan_generator.generate_plan_with_self_correction(
+            "Refactor app", ["src/app.py", "src/missing.py"]
+        )
+        
+        assert success
+        assert plan["objective"]["affected_files"] == ["src/app.py"]
+        assert [p.name for p in (temp_dir / "plans").iterdir()] == [f"{plan['plan_id']}.json"]
+    
+    def test_validate_plan_internal_feedback(self):
+        """Los errores del validador alimentan analyze_validation_errors."""
+        valid, output = plan_generator.validate_plan_internal({"plan_id": "bad", "steps": []})
+        
+        assert not valid
+        assert "plan_id" in plan_generator.analyze_validation_errors(output)
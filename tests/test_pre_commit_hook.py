@@ -0,0 +1,63 @@
+"""
+Tests para pre_commit_hook.py
+"""
+import pytest
+import threading
+from pathlib import Path
+import sys
+
+# Añadir scripts al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import pre_commit_hook
+
+
+class TestPreCommitHook:
+    """Tests para los checks del hook de pre-commit."""
+    
+    def test_staged_files_queried_once(self, monkeypatch):
+        """git se consulta una vez; los subconjuntos salen de esa lista."""
+        calls = []
+        monkeypatch.setattr(pre_commit_hook, "get_staged_files",
+                            lambda: (calls.append(1), ["app.py", "requirements.txt", "README.md"])[1])
+        linted = []
+        monkeypatch.setattr(pre_commit_hook, "run_lint_check", lambda files: (linted.extend(files), (True, ""))[1])
+        
+        assert pre_commit_hook.run_pre_commit(skip_snyk=True, skip_deps=True)
+        
+        assert len(calls) == 1
+        assert linted == ["app.py"]
+    
+    @pytest.mark.parametrize("output,expected", [
+        ('{"runs": [{"results": [{"level": "error"}, {"level": "warning"}, {"level": "error"}]}]}', (0, 2)),
+        ('{"runs": []}', (0, 0)),
+        ("Critical issue\n[HIGH] issue\nHigh severity issue", (1, 2)),
+    ])
+    def test_count_snyk_code_issues(self, output, expected):
+        """Cuenta sobre el SARIF de --json, o sobre el texto si no lo es."""
+        assert pre_commit_hook.count_snyk_code_issues(output) == expected
+    
+    def test_missing_snyk_skips_without_spawning(self, monkeypatch):
+        """Sin Snyk CLI los scans se saltan sin lanzar procesos."""
+        monkeypatch.setattr(pre_commit_hook, "SNYK_BIN", None)
+        monkeypatch.setattr(pre_commit_hook.subprocess, "run", lambda *a, **k: pytest.fail("no debe ejecutarse"))
+        
+        assert pre_commit_hook.run_snyk_code_scan() == (True, "Snyk no disponible", 0, 0)
+        assert pre_commit_hook.run_snyk_dependency_scan({"requirements.txt"})[0]
+    
+    def test_checks_run_concurrently_with_ordered_output(self, monkeypatch, capsys):
+        """Lint y Snyk corren a la vez; los mensajes salen bajo su seccion."""
+        monkeypatch.setattr(pre_commit_hook, "get_staged_files", lambda: ["app.py"])
+        monkeypatch.setattr(pre_commit_hook, "SNYK_BIN", None)
+        code_started = threading.Event()
+        original_scan = pre_commit_hook.run_snyk_code_scan
+        monkeypatch.setattr(pre_commit_hook, "run_snyk_code_scan",
+                            lambda messages=None: (code_started.set(), original_scan(messages))[1])
+        # El lint solo termina si el scan de codigo arranca en paralelo
+        monkeypatch.setattr(pre_commit_hook, "run_lint_check",
+                            lambda files: (code_started.wait(timeout=5), ""))
+        
+        assert pre_commit_hook.run_pre_commit()
+        
+        out = capsys.readouterr().out
+        assert out.index("[2/4]") < out.index("Snyk CLI no encontrado") < out.index("[3/4]")